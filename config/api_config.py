@@ -8,9 +8,11 @@ the fuzzing framework. It provides a centralized configuration for:
 - API naming conventions
 """
 
-# List of APIs available for fuzzing
+from types import MappingProxyType
+
+# APIs available for fuzzing, in fuzzing order
 # Format: 'module/submodule' (e.g., 'zdo/mgmt_bind_request')
-FUZZING_API_CHOICES = [
+FUZZING_API_CHOICES = (
     'zdo/top_level_module',
     'zdo/bind_request',
     'zdo/bind_request_response',
@@ -22,12 +24,15 @@ FUZZING_API_CHOICES = [
     'socket/init',
     'socket/http',
     'socket/url'
-]
+)
+
+# Set view of FUZZING_API_CHOICES for O(1) membership tests
+FUZZING_API_CHOICES_SET = frozenset(FUZZING_API_CHOICES)
 
 # Mapping of API names to their associated functions
 # Each API has a list of functions that can be fuzzed
 # Format: 'api_name': ['function1()', 'function2()', ...]
-FUNC_SUM = {
+_RAW_FUNC_SUM = {
     'zdo/top_level_module': [
         "parse_zdo_command()"
     ],
@@ -164,18 +169,21 @@ FUNC_SUM = {
     ]
 }
 
+# Read-only view of _RAW_FUNC_SUM with each function list frozen to a tuple
+FUNC_SUM = MappingProxyType({api: tuple(funcs) for api, funcs in _RAW_FUNC_SUM.items()})
+
 
-def get_api_functions(api_name: str) -> list:
+def get_api_functions(api_name: str) -> tuple:
     """
-    Get the list of functions for a given API.
+    Get the functions for a given API.
     
     Args:
         api_name: The API name in format 'module/submodule'
         
     Returns:
-        List of function names for the API, or empty list if API not found
+        Tuple of function names for the API, or empty tuple if API not found
     """
-    return FUNC_SUM.get(api_name, [])
+    return FUNC_SUM.get(api_name, ())
 
 
 def is_valid_api(api_name: str) -> bool:
@@ -188,5 +196,5 @@ def is_valid_api(api_name: str) -> bool:
     Returns:
         True if the API is valid, False otherwise
     """
-    return api_name in FUZZING_API_CHOICES
+    return api_name in FUZZING_API_CHOICES_SET
 
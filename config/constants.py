@@ -14,6 +14,7 @@ DEFAULT_API_CODES_PATH = os.path.join(DEFAULT_API_SOURCE_PATH, "api_codes")
 DEFAULT_FUZZING_CASES_PATH = "./fuzzing_cases"
 DEFAULT_LOGS_PATH = "./logs"
 DEFAULT_VECTORSTORE_PATH = "./vectorstore"
+DEFAULT_GPT_CACHE_PATH = "./cache/gpt"
 
 # Default file names
 DEFAULT_LOG_FILE_ST = "fuzz_log_st"
@@ -22,7 +23,7 @@ DEFAULT_LOG_FILE_APP = "fuzz_log_app"
 # Default network configuration
 DEFAULT_HUB_IP = "192.168.1.100"
 DEFAULT_FUZZ_IP = "192.168.1.101"
-DEFAULT_FUZZ_PORT = "34567"
+DEFAULT_FUZZ_PORT = 34567
 
 # Default LLM models
 DEFAULT_GPT_MODEL = "gpt-4o"
@@ -30,10 +31,29 @@ DEFAULT_CLAUDE_MODEL = "claude-3-7-sonnet-20250219"
 DEFAULT_HUGGINGFACE_MODEL = "Qwen/Qwen2.5-Coder-32B-Instruct"
 
 # Fuzzing parameters
-DEFAULT_ROUND = "0"
-DEFAULT_TOTAL_ROUNDS = "10"
+DEFAULT_ROUND = 0
+DEFAULT_TOTAL_ROUNDS = 10
 DEFAULT_MAX_TOKENS = 16000
 DEFAULT_TEMPERATURE = 0.1
+# Test cases sent to the hub concurrently; 1 keeps the edge driver log in case order
+DEFAULT_MAX_IN_FLIGHT = 1
+# API/function pairs fuzzed concurrently in random fuzzing mode
+DEFAULT_WORKERS = 1
+# Threads used for concurrent file reads/writes
+DEFAULT_FILE_IO_WORKERS = 32
+# Chat completion requests sent to the LLM API concurrently
+DEFAULT_LLM_CONCURRENCY = 8
+# Attempts per LLM request on rate limits, connection and server errors
+DEFAULT_LLM_MAX_ATTEMPTS = 6
+# Chunks embedded per embeddings API request, and approximate token budget
+# per minute (at ~4 characters per token) when building the vector store
+EMBEDDING_BATCH_SIZE = 128
+EMBEDDING_TOKENS_PER_MINUTE = 250000
+# Embedding batch requests sent concurrently
+EMBEDDING_CONCURRENCY = 16
+
+# Console logging level; DEBUG prints every test case sent to the hub
+DEFAULT_LOG_LEVEL = "DEBUG"
 
 # Log markers for extraction
 LOG_START_MARKER = "testing code generated by gpt..."
@@ -46,6 +66,18 @@ HTTP_OK = "200 OK"
 HTTP_BAD_REQUEST = "400 Bad Request"
 SOCKET_BUFFER_SIZE = 1024
 SOCKET_RESPONSE_BUFFER_SIZE = 4096
+SOCKET_HANDSHAKE_BUFFER_SIZE = 64
+
+# Write buffer for large aggregated output files
+OUTPUT_BUFFER_SIZE = 1 << 20
+
+# Command log file buffering; buffered lines are flushed at this interval
+LOG_BUFFER_SIZE = 1 << 16
+LOG_FLUSH_INTERVAL = 0.1
+
+# OpenAI batch input file limits
+BATCH_MAX_FILE_BYTES = 100 * 1024 * 1024
+BATCH_MAX_REQUESTS = 50000
 
 # File extensions
 EXT_JSON = ".json"
@@ -61,3 +93,6 @@ ENV_OPENAI_API_KEY = "OPENAI_API_KEY"
 ENV_ANTHROPIC_API_KEY = "ANTHROPIC_API_KEY"
 ENV_HUGGINGFACE_TOKEN = "HUGGINGFACE_TOKEN"
 
+# Set to "1" to reuse cached GPT responses for identical prompts
+ENV_GPT_CACHE = "EDGEFUZZ_GPT_CACHE"
+
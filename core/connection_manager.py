@@ -6,21 +6,48 @@ formatting for the fuzzing framework. It manages the connection between
 the fuzzing application and the SmartThings Edge Driver hub.
 """
 
+import asyncio
 import socket
 import json
 import psutil
-import time
 import os
-from types import SimpleNamespace
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable, List, Tuple, BinaryIO, Union
 
 from config.constants import (
     SOCKET_BUFFER_SIZE,
+    SOCKET_HANDSHAKE_BUFFER_SIZE,
     SOCKET_RESPONSE_BUFFER_SIZE,
     HTTP_CONTENT_TYPE_JSON,
     HTTP_OK,
-    HTTP_BAD_REQUEST
+    HTTP_BAD_REQUEST,
+    DEFAULT_MAX_IN_FLIGHT
 )
+from utils.json_processor import loads_json
+
+
+# psutil.Process handles keyed by pid, reused across check_and_close_port calls
+_process_cache: Dict[int, "psutil.Process"] = {}
+
+
+def _get_process(pid: int) -> "psutil.Process":
+    """
+    Get a cached psutil.Process for a pid.
+    
+    psutil verifies the process creation time before signalling, so a cached
+    handle whose pid has been reused raises NoSuchProcess instead of
+    signalling the wrong process; such entries are evicted by the caller.
+    
+    Args:
+        pid: Process ID
+        
+    Returns:
+        psutil.Process instance for the pid
+    """
+    process = _process_cache.get(pid)
+    if process is None:
+        process = psutil.Process(pid)
+        _process_cache[pid] = process
+    return process
 
 
 def check_and_close_port(port: int) -> None:
@@ -33,23 +60,61 @@ def check_and_close_port(port: int) -> None:
     Args:
         port: The port number to check and free
     """
-    for conn in psutil.net_connections(kind='inet'):
-        if conn.laddr.port == port:
-            pid = conn.pid
-            try:
-                process = psutil.Process(pid)
-                process.terminate()
-                print(f"Port {port} was in use and has been closed (process {pid} terminated).")
-            except psutil.AccessDenied:
-                print(f"Access denied: Unable to terminate process with PID {pid}. "
-                      f"You might need elevated permissions.")
-            except psutil.NoSuchProcess:
-                print(f"Process with PID {pid} no longer exists.")
-            except psutil.ZombieProcess:
-                print(f"Process with PID {pid} is a zombie process and cannot be terminated.")
-            return
+    # Only IPv4 TCP sockets can hold the server port; restricting the kind
+    # avoids resolving every UDP/UNIX fd on the system.
+    found = False
+    terminated = set()
+    for conn in psutil.net_connections(kind='tcp4'):
+        if conn.laddr.port != port:
+            continue
+        found = True
+        pid = conn.pid
+        if pid is None or pid in terminated:
+            continue
+        terminated.add(pid)
+        try:
+            process = _get_process(pid)
+            process.terminate()
+            process.wait(timeout=1)
+            _process_cache.pop(pid, None)
+            print(f"Port {port} was in use and has been closed (process {pid} terminated).")
+        except psutil.TimeoutExpired:
+            print(f"Process with PID {pid} did not exit within 1 second after terminate.")
+        except psutil.AccessDenied:
+            print(f"Access denied: Unable to terminate process with PID {pid}. "
+                  f"You might need elevated permissions.")
+        except psutil.ZombieProcess:
+            _process_cache.pop(pid, None)
+            print(f"Process with PID {pid} is a zombie process and cannot be terminated.")
+        except psutil.NoSuchProcess:
+            _process_cache.pop(pid, None)
+            print(f"Process with PID {pid} no longer exists.")
+    
+    if not found:
+        print(f"Port {port} is not in use.")
+
+
+def create_server_socket(ip: str, port: int) -> socket.socket:
+    """
+    Create a TCP server socket bound to the given address.
+    
+    SO_REUSEADDR lets the socket rebind immediately while a previous run's
+    connections are still in TIME_WAIT, and SO_REUSEPORT (where supported)
+    allows several fuzzer workers to share the same listening port.
     
-    print(f"Port {port} is not in use.")
+    Args:
+        ip: IP address to bind the server to
+        port: Port number to bind the server to
+        
+    Returns:
+        The bound (not yet listening) server socket
+    """
+    server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if hasattr(socket, 'SO_REUSEPORT'):
+        server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    server_socket.bind((ip, port))
+    return server_socket
 
 
 def start_server(ip: str, port: int) -> int:
@@ -66,64 +131,117 @@ def start_server(ip: str, port: int) -> int:
     Returns:
         The port number received from the fuzzing app
     """
-    server_socket = None
-    
     # Ensure the port is available
     check_and_close_port(port)
     
-    while True:
-        try:
-            server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            server_socket.bind((ip, port))
-            break
-        except OSError as e:
-            if e.errno == 48:  # Address already in use
-                print(f"Port {port} is already in use. Trying to free it...")
-                check_and_close_port(port)
-                time.sleep(1)
-            else:
-                raise
-    
+    server_socket = create_server_socket(ip, port)
     server_socket.listen(5)
     print(f"Start the server on fuzzing app and listening on {ip}:{port}...")
     
-    # Wait for connection from fuzzing app
-    while True:
-        client_socket, addr = server_socket.accept()
-        
-        try:
-            while True:
-                data = client_socket.recv(SOCKET_BUFFER_SIZE)
-                if not data:
-                    break
-                    
-                decoded_data = data.decode()
-                print(f"Received: {decoded_data}")
+    # Wait for the fuzzing app to send its port number; the handshake is a
+    # single short message, so one bounded recv() per connection suffices
+    with server_socket:
+        while True:
+            client_socket, addr = server_socket.accept()
+            
+            with client_socket:
+                # Disable Nagle so the small handshake reply is not delayed
+                client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                data = client_socket.recv(SOCKET_HANDSHAKE_BUFFER_SIZE)
                 
                 try:
+                    decoded_data = data.decode()
+                    print(f"Received: {decoded_data}")
                     port_num = int(decoded_data)
-                    print(f'Port number received: {port_num}')
-                    
-                    # Send HTTP response with port number
-                    response = (f"HTTP/1.1 {HTTP_OK}\r\n"
-                              f"Content-Length: {len(str(port_num))}\r\n\r\n"
-                              f"{port_num}")
-                    
-                    # Send response in chunks
-                    response_chunks = [response[i:i+10] for i in range(0, len(response), 10)]
-                    for chunk in response_chunks:
-                        client_socket.sendall(chunk.encode())
-                    break
                 except ValueError:
+                    port_num = None
                     print("Invalid port number received.")
                     response = f"HTTP/1.1 {HTTP_BAD_REQUEST}\r\nContent-Length: 0\r\n\r\n"
-                    client_socket.sendall(response.encode())
-        finally:
-            client_socket.close()
+                else:
+                    print(f'Port number received: {port_num}')
+                    body = str(port_num)
+                    response = (f"HTTP/1.1 {HTTP_OK}\r\n"
+                              f"Content-Length: {len(body)}\r\n\r\n"
+                              f"{body}")
+                
+                client_socket.sendall(response.encode())
+            
             print("Connection closed with", addr)
-        break
+            if port_num is not None:
+                return port_num
+
+
+def _read_http_message(
+    rfile: BinaryIO,
+    read_until_close: bool = False
+) -> Tuple[bytes, bytes, Optional[int]]:
+    """
+    Read one HTTP message from a buffered reader.
     
-    return port_num
+    Args:
+        rfile: Buffered binary reader wrapping a connected socket
+        read_until_close: If the message has no Content-Length header, keep
+                          reading until the peer closes the connection
+                          (HTTP response semantics) instead of treating the
+                          body as empty (HTTP request semantics)
+        
+    Returns:
+        Tuple of (raw header bytes, body bytes, declared Content-Length or None).
+        The header is empty if the peer closed the connection before sending
+        anything.
+    """
+    header_lines = [rfile.readline()]
+    content_length = None
+    
+    while True:
+        line = rfile.readline()
+        header_lines.append(line)
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.partition(b":")
+        if name.strip().lower() == b"content-length":
+            try:
+                content_length = int(value.strip())
+            except ValueError:
+                content_length = None
+    
+    if content_length is not None:
+        body = rfile.read(content_length)
+    elif read_until_close:
+        body = rfile.read()
+    else:
+        body = b""
+    
+    return b"".join(header_lines), body, content_length
+
+
+def recv_http_message(
+    sock: socket.socket,
+    buffer_size: int,
+    read_until_close: bool = False
+) -> bytes:
+    """
+    Receive a complete HTTP message from a connected socket.
+    
+    The socket is wrapped in a buffered reader so header lines and the body
+    are framed by CPython's C-level readline()/read() instead of a
+    hand-rolled recv() loop. The body length is taken from Content-Length.
+    
+    Args:
+        sock: Connected socket to read from
+        buffer_size: Size of the read buffer
+        read_until_close: If the message has no Content-Length header, keep
+                          reading until the peer closes the connection
+                          (HTTP response semantics) instead of treating the
+                          body as empty (HTTP request semantics)
+        
+    Returns:
+        Raw message bytes (headers and body)
+    """
+    with sock.makefile('rb', buffering=buffer_size) as rfile:
+        header, body, _ = _read_http_message(rfile, read_until_close)
+    
+    return header + body
 
 
 def receive_response(ip: str, port: int) -> Optional[Dict[str, Any]]:
@@ -140,8 +258,7 @@ def receive_response(ip: str, port: int) -> Optional[Dict[str, Any]]:
     Returns:
         Parsed JSON response dictionary, or None if parsing fails
     """
-    server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    server_socket.bind((ip, port))
+    server_socket = create_server_socket(ip, port)
     server_socket.listen(5)
     print(f"Listening on {ip}:{port}...")
     
@@ -150,12 +267,7 @@ def receive_response(ip: str, port: int) -> Optional[Dict[str, Any]]:
         print(f"Connected by {addr}")
         
         try:
-            data = b""
-            while True:
-                part = client_socket.recv(SOCKET_BUFFER_SIZE)
-                data += part
-                if len(part) < SOCKET_BUFFER_SIZE:
-                    break
+            data = recv_http_message(client_socket, SOCKET_BUFFER_SIZE)
             
             if data:
                 decoded_data = data.decode()
@@ -165,7 +277,7 @@ def receive_response(ip: str, port: int) -> Optional[Dict[str, Any]]:
                 header, _, body = decoded_data.partition("\r\n\r\n")
                 if body:
                     try:
-                        json_data = json.loads(body)
+                        json_data = loads_json(body)
                         print("JSON data received successfully.")
                         client_socket.sendall(b"JSON received successfully.")
                         return json_data
@@ -181,7 +293,7 @@ def receive_response(ip: str, port: int) -> Optional[Dict[str, Any]]:
     return None
 
 
-def build_json_request(fuzzing_api_name: str, test_case: list) -> SimpleNamespace:
+def build_json_request(fuzzing_api_name: str, test_case: list) -> Dict[str, Any]:
     """
     Build a JSON request object from test case data.
     
@@ -191,16 +303,61 @@ def build_json_request(fuzzing_api_name: str, test_case: list) -> SimpleNamespac
                    [Test_Case, API_Name, Function_Name, Description, Code_Snippets, Pre-operation_Python]
         
     Returns:
-        SimpleNamespace object representing the JSON request
+        Dictionary representing the JSON request, ready to be serialized
     """
-    json_request = {
+    return {
         "Test_Case": test_case[0],
         "API_Name": fuzzing_api_name,
         "Function_Name": test_case[2],
         "Description": test_case[3],
         "Code_Snippets": test_case[4],  # List of code snippets
     }
-    return SimpleNamespace(**json_request)
+
+
+def _build_http_request(ip: str, json_message: str) -> bytes:
+    """
+    Build the HTTP POST request carrying a test case.
+    
+    Args:
+        ip: IP address of the hub (used for the Host header)
+        json_message: JSON string containing the test case
+        
+    Returns:
+        Encoded HTTP request
+    """
+    body = json_message.encode('utf-8')
+    header = (f"POST / HTTP/1.1\r\n"
+             f"Host: {ip}\r\n"
+             f"Content-Type: {HTTP_CONTENT_TYPE_JSON}\r\n"
+             f"Content-Length: {len(body)}\r\n\r\n")
+    return header.encode('utf-8') + body
+
+
+def _parse_json_response(response: str) -> Optional[Dict[str, Any]]:
+    """
+    Parse the JSON body of an HTTP response received from the hub.
+    
+    Args:
+        response: Decoded HTTP response (headers and body)
+        
+    Returns:
+        Parsed JSON response dictionary, or None if the body is missing or invalid
+    """
+    if "\r\n\r\n" in response:
+        header, body = response.split("\r\n\r\n", 1)
+        if body.strip():
+            try:
+                json_response = loads_json(body)
+                print(f"Response received: {json_response} \n")
+                return json_response
+            except json.JSONDecodeError as json_err:
+                print(f"JSON decoding error: {json_err}")
+        else:
+            print("Received an empty body.")
+    else:
+        print("Invalid HTTP response format.")
+    
+    return None
 
 
 def send_message(ip: str, port: int, json_message: str) -> Optional[Dict[str, Any]]:
@@ -222,43 +379,240 @@ def send_message(ip: str, port: int, json_message: str) -> Optional[Dict[str, An
     
     try:
         client_socket.connect((ip, port))
+        client_socket.sendall(_build_http_request(ip, json_message))
         
-        # Build HTTP POST request
-        request = (f"POST / HTTP/1.1\r\n"
-                  f"Host: {ip}\r\n"
-                  f"Content-Type: {HTTP_CONTENT_TYPE_JSON}\r\n"
-                  f"Content-Length: {len(json_message)}\r\n\r\n"
-                  f"{json_message}")
+        # Receive response
+        response = recv_http_message(
+            client_socket,
+            SOCKET_RESPONSE_BUFFER_SIZE,
+            read_until_close=True
+        ).decode('utf-8')
         
-        client_socket.sendall(request.encode('utf-8'))
+        return _parse_json_response(response)
+            
+    except Exception as e:
+        print(f"An error occurred: {e}")
+    finally:
+        client_socket.close()
+    
+    return None
+
+
+def _sendmsg_all(sock: socket.socket, buffers: List[bytes]) -> None:
+    """
+    Send several buffers as one message without concatenating them.
+    
+    The buffers are handed to sendmsg() as a scatter-gather list so the
+    kernel gathers them directly; partial sends are resumed from the first
+    unsent byte. Platforms without sendmsg() (Windows) fall back to a single
+    sendall() of the joined buffers.
+    
+    Args:
+        sock: Connected socket to write to
+        buffers: Byte strings to send, in order
+    """
+    if not hasattr(sock, 'sendmsg'):
+        sock.sendall(b"".join(buffers))
+        return
+    
+    views = [memoryview(buf) for buf in buffers if buf]
+    while views:
+        sent = sock.sendmsg(views)
+        while views and sent >= len(views[0]):
+            sent -= len(views[0])
+            views.pop(0)
+        if views and sent:
+            views[0] = views[0][sent:]
+
+
+class HubClient:
+    """
+    Persistent HTTP/1.1 connection to the hub.
+    
+    A single TCP connection is reused for consecutive test cases instead of
+    connecting once per case. If the hub does not keep the connection alive
+    (it answers with "Connection: close" or without Content-Length), the
+    connection is closed after the response and the next send() reconnects,
+    which is equivalent to send_message().
+    
+    Instances are not thread-safe; use one client per thread.
+    """
+    
+    def __init__(self, ip: str, port: int):
+        """
+        Initialize the HubClient. The connection is opened lazily.
+        
+        Args:
+            ip: IP address of the hub
+            port: Port number of the hub
+        """
+        self.ip = ip
+        self.port = port
+        self.sock: Optional[socket.socket] = None
+        self.rfile: Optional[BinaryIO] = None
+        
+        # Request headers are identical for every test case except Content-Length
+        self._header_prefix = (f"POST / HTTP/1.1\r\n"
+                               f"Host: {ip}\r\n"
+                               f"Content-Type: {HTTP_CONTENT_TYPE_JSON}\r\n"
+                               f"Connection: keep-alive\r\n"
+                               f"Content-Length: ").encode('utf-8')
+    
+    def connect(self) -> None:
+        """Open the TCP connection to the hub."""
+        self.sock = socket.create_connection((self.ip, self.port))
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.rfile = self.sock.makefile('rb', buffering=SOCKET_RESPONSE_BUFFER_SIZE)
+    
+    def close(self) -> None:
+        """Close the connection to the hub, if open."""
+        if self.rfile is not None:
+            self.rfile.close()
+            self.rfile = None
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+    
+    def __enter__(self) -> "HubClient":
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+    
+    def send(self, json_message: Union[str, bytes]) -> Optional[Dict[str, Any]]:
+        """
+        Send a JSON message to the hub and receive the response.
+        
+        If a reused connection is closed by the hub before any response bytes
+        arrive, it is reopened and the request is sent once more. Other errors
+        are not retried, since the hub may already have run the test case.
+        
+        Args:
+            json_message: JSON string containing the test case, or its UTF-8
+                          encoding (avoids re-encoding serializer output)
+            
+        Returns:
+            Parsed JSON response dictionary, or None if communication fails
+        """
+        if isinstance(json_message, str):
+            json_message = json_message.encode('utf-8')
+        request = [
+            self._header_prefix,
+            str(len(json_message)).encode('ascii'),
+            b"\r\n\r\n",
+            json_message
+        ]
         
-        # Receive response
-        response = ''
         while True:
-            chunk = client_socket.recv(SOCKET_RESPONSE_BUFFER_SIZE)
-            if not chunk:
+            reused = self.sock is not None
+            try:
+                if not reused:
+                    self.connect()
+                _sendmsg_all(self.sock, request)
+                header, body, content_length = _read_http_message(
+                    self.rfile,
+                    read_until_close=True
+                )
+            except OSError as e:
+                self.close()
+                print(f"An error occurred: {e}")
+                return None
+            
+            if not header:
+                # The hub closed the idle connection without answering; only
+                # this case is safe to resend on a fresh connection
+                self.close()
+                if reused:
+                    continue
+                print("An error occurred: Connection closed by the hub")
+                return None
+            
+            if content_length is None or b"connection: close" in header.lower():
+                self.close()
+            
+            return _parse_json_response((header + body).decode('utf-8'))
+
+
+async def send_message_async(ip: str, port: int, json_message: str) -> Optional[Dict[str, Any]]:
+    """
+    Asynchronous counterpart of send_message().
+    
+    Args:
+        ip: IP address of the hub
+        port: Port number of the hub
+        json_message: JSON string containing the test case
+        
+    Returns:
+        Parsed JSON response dictionary, or None if communication fails
+    """
+    writer = None
+    
+    try:
+        reader, writer = await asyncio.open_connection(ip, port)
+        writer.write(_build_http_request(ip, json_message))
+        await writer.drain()
+        
+        # Receive response, framed by Content-Length when present
+        header = await reader.readuntil(b"\r\n\r\n")
+        content_length = None
+        for line in header.split(b"\r\n")[1:]:
+            name, _, value = line.partition(b":")
+            if name.strip().lower() == b"content-length":
+                content_length = int(value.strip())
                 break
-            response += chunk.decode('utf-8')
         
-        # Parse HTTP response
-        if "\r\n\r\n" in response:
-            header, body = response.split("\r\n\r\n", 1)
-            if body.strip():
-                try:
-                    json_response = json.loads(body)
-                    print(f"Response received: {json_response} \n")
-                    return json_response
-                except json.JSONDecodeError as json_err:
-                    print(f"JSON decoding error: {json_err}")
-            else:
-                print("Received an empty body.")
+        if content_length is not None:
+            body = await reader.readexactly(content_length)
         else:
-            print("Invalid HTTP response format.")
-            
+            body = await reader.read()
+        
+        return _parse_json_response((header + body).decode('utf-8'))
+        
     except Exception as e:
         print(f"An error occurred: {e}")
     finally:
-        client_socket.close()
+        if writer is not None:
+            writer.close()
+            await writer.wait_closed()
     
     return None
 
+
+def send_messages_concurrently(
+    ip: str,
+    port: int,
+    json_messages: List[str],
+    max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+    on_response: Optional[Callable[[int, Optional[Dict[str, Any]]], None]] = None
+) -> List[Optional[Dict[str, Any]]]:
+    """
+    Send several JSON messages to the hub with overlapping round trips.
+    
+    At most max_in_flight requests are outstanding at any time. The hub may
+    execute the test cases out of order, so only use this when the edge
+    driver log does not have to follow the order of the test cases.
+    
+    Args:
+        ip: IP address of the hub
+        port: Port number of the hub
+        json_messages: JSON strings containing the test cases
+        max_in_flight: Maximum number of concurrent requests
+        on_response: Optional callback invoked with the index of each message
+                     and its response as soon as that response arrives
+        
+    Returns:
+        Parsed JSON responses, in the same order as json_messages
+    """
+    async def _send_all() -> List[Optional[Dict[str, Any]]]:
+        semaphore = asyncio.Semaphore(max_in_flight)
+        
+        async def _send(index: int, json_message: str) -> Optional[Dict[str, Any]]:
+            async with semaphore:
+                response = await send_message_async(ip, port, json_message)
+            if on_response is not None:
+                on_response(index, response)
+            return response
+        
+        return await asyncio.gather(*(_send(i, message) for i, message in enumerate(json_messages)))
+    
+    return asyncio.run(_send_all())
@@ -7,16 +7,25 @@ execution, logging, and result analysis.
 """
 
 import json
-import datetime
+import time
 import argparse
-from typing import List, Optional
-import os
+import logging
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
 
 from core.connection_manager import (
     start_server,
-    send_message,
+    HubClient,
+    send_messages_concurrently,
     build_json_request
 )
+from utils.json_processor import loads_json, dumps_json, dumps_json_bytes
 from config.api_config import FUZZING_API_CHOICES, FUNC_SUM
 from config.constants import (
     DEFAULT_HUB_IP,
@@ -26,47 +35,186 @@ from config.constants import (
     DEFAULT_TOTAL_ROUNDS,
     DEFAULT_LLM_MODEL,
     DEFAULT_API_SOURCE_PATH,
-    DEFAULT_LOGS_PATH,
     DEFAULT_LOG_FILE_ST,
+    DEFAULT_MAX_IN_FLIGHT,
+    DEFAULT_WORKERS,
+    DEFAULT_LOG_LEVEL,
     EXT_JSON
 )
 
+logger = logging.getLogger(__name__)
+
+# Exceptions raised for malformed test case files by either parser
+JSON_DECODE_ERRORS = (json.JSONDecodeError,) + ((ijson.JSONError,) if ijson is not None else ())
+
 
-def render_test_cases_file(filename: str) -> List[list]:
+def format_timestamp() -> str:
     """
-    Load and parse test cases from a JSON file.
+    Format the current local time with millisecond precision.
+    
+    Equivalent to datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3], but
+    the milliseconds are computed from time.time_ns() so the %f conversion
+    and the trailing slice are skipped.
+    
+    Returns:
+        Timestamp string in the form "YYYY-MM-DD HH:MM:SS.mmm"
+    """
+    secs, ms = divmod(time.time_ns() // 1_000_000, 1000)
+    return f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(secs))}.{ms:03d}"
+
+
+def render_test_cases_file(filename: str) -> Iterator[list]:
+    """
+    Stream test cases from a JSON file.
+    
+    With ijson installed the file is parsed incrementally, so the first test
+    case is available before the whole file has been read; otherwise the
+    file is parsed in one go. Errors are reported and end the stream.
     
     Args:
         filename: Path to the JSON file containing test cases
         
-    Returns:
-        List of test case lists, each containing:
+    Yields:
+        Test case lists, each containing:
         [Test_Case, API_Name, Function_Name, Description, Code_Snippets, Pre-operation_Python]
     """
     try:
-        with open(filename, "r") as file:
-            test_cases = json.load(file)
-        
-        test_cases_list = []
-        for case in test_cases:
-            test_case_sublist = [
-                case.get("Test_Case"),
-                case.get("API_Name"),
-                case.get("Function_Name"),
-                case.get("Description"),
-                case.get("Code_Snippets", []),
-                case.get("Pre-operation_Python", None)
-            ]
-            test_cases_list.append(test_case_sublist)
-        
-        return test_cases_list
+        with open(filename, "rb") as file:
+            if ijson is not None:
+                test_cases = ijson.items(file, 'item', use_float=True)
+            else:
+                test_cases = loads_json(file.read())
+            
+            for case in test_cases:
+                yield [
+                    case.get("Test_Case"),
+                    case.get("API_Name"),
+                    case.get("Function_Name"),
+                    case.get("Description"),
+                    case.get("Code_Snippets", []),
+                    case.get("Pre-operation_Python", None)
+                ]
     
     except FileNotFoundError:
         print(f"Error: File '{filename}' not found.")
-        return []
-    except json.JSONDecodeError:
+    except JSON_DECODE_ERRORS:
         print("Error: Invalid JSON format.")
-        return []
+
+
+def send_test_case_window(
+    hub_ip: str,
+    port_number: int,
+    json_messages: List[Dict[str, Any]],
+    max_in_flight: int
+) -> None:
+    """
+    Send a window of test cases to the hub with overlapping round trips.
+    
+    Each response is logged at debug level as soon as it arrives.
+    
+    Args:
+        hub_ip: IP address of the hub
+        port_number: Hub port number
+        json_messages: Test case requests built by build_json_request
+        max_in_flight: Maximum number of concurrent hub requests
+    """
+    def log_response(index: int, response: Optional[Dict[str, Any]]) -> None:
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
+        logger.debug(
+            '%s received response for %s of %s',
+            format_timestamp(),
+            json_messages[index]['Function_Name'],
+            json_messages[index]['API_Name']
+        )
+    
+    send_messages_concurrently(
+        hub_ip,
+        port_number,
+        [dumps_json(json_message) for json_message in json_messages],
+        max_in_flight,
+        on_response=log_response
+    )
+
+
+def fuzz_api_function(
+    api: str,
+    func: str,
+    args: argparse.Namespace,
+    port_number: int
+) -> bool:
+    """
+    Execute all fuzzing rounds for one function of an API.
+    
+    Args:
+        api: API name
+        func: Function name
+        args: Argument namespace (see random_fuzzing)
+        port_number: Hub port number received from the fuzzing app
+        
+    Returns:
+        False if a round had no test cases and fuzzing should stop, True otherwise
+    """
+    # Determine the test file of every round up front
+    if EXT_JSON in args.test_file:
+        rounds = [(curr_round, args.test_file)
+                  for curr_round in range(args.round, args.total_round + 1)]
+    else:
+        rounds = [(curr_round, f"{args.test_file}{api}-{curr_round}{func}{EXT_JSON}")
+                  for curr_round in range(args.round, args.total_round + 1)]
+    
+    print(f'Received port number {port_number} from {args.fuzz_port}')
+    print(f'Starting fuzzing {api} {func}...')
+    
+    # Execute fuzzing rounds over one persistent hub connection
+    with HubClient(args.hub_ip, port_number) as hub_client:
+        for curr_round, test_file in rounds:
+            print(f"##### Fuzzing Round: {curr_round} #####")
+            
+            # Execute each test case as it is loaded
+            case_count = 0
+            pending_messages = []
+            for test_case in render_test_cases_file(test_file):
+                case_count += 1
+                json_message = build_json_request(api, test_case)
+                
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(
+                        '%s testing %s of %s for "%s"\n'
+                        'Code snippets:\n%s',
+                        format_timestamp(),
+                        json_message['Function_Name'],
+                        json_message['API_Name'],
+                        json_message['Description'][:-1],
+                        '\n'.join(map(str, json_message.get('Code_Snippets', [])))
+                    )
+                
+                # Send test case to hub, or add it to the next concurrent window
+                if args.max_in_flight > 1:
+                    pending_messages.append(json_message)
+                    if len(pending_messages) >= args.max_in_flight:
+                        send_test_case_window(args.hub_ip, port_number,
+                                              pending_messages, args.max_in_flight)
+                        pending_messages = []
+                else:
+                    hub_client.send(dumps_json_bytes(json_message))
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug('%s received response for %s of %s', format_timestamp(),
+                                     json_message['Function_Name'], json_message['API_Name'])
+            
+            if pending_messages:
+                send_test_case_window(args.hub_ip, port_number,
+                                      pending_messages, args.max_in_flight)
+            
+            if not case_count:
+                print("No test cases found. Exiting.")
+                return False
+    
+    # Process results and generate next round cases
+    # Note: log_validation and generate_cases_scd would be imported
+    # from appropriate modules in a complete implementation
+    print(f"Fuzzing completed for {api} {func}")
+    return True
 
 
 def random_fuzzing(args: argparse.Namespace) -> None:
@@ -80,6 +228,9 @@ def random_fuzzing(args: argparse.Namespace) -> None:
     4. Executing test cases and sending them to the hub
     5. Processing results and generating next round cases
     
+    With more than one worker, API/function pairs are fuzzed concurrently,
+    each over its own hub connection.
+    
     Args:
         args: Argument namespace containing fuzzing configuration:
               - fuzz_ip: IP address of fuzzing app
@@ -90,11 +241,32 @@ def random_fuzzing(args: argparse.Namespace) -> None:
               - test_file: Test case file path or pattern
               - api_source: Path to API source files
               - llm_model: LLM model to use for case generation
+              - max_in_flight: Maximum number of concurrent hub requests
+              - workers: Number of API/function pairs fuzzed concurrently
               - log_file_name_st: Name for SmartThings log file
               - log_file_name_app: Name for app log file
     """
     # Start server to receive port number from fuzzing app
-    port_number = start_server(args.fuzz_ip, int(args.fuzz_port))
+    port_number = start_server(args.fuzz_ip, args.fuzz_port)
+    
+    if args.workers > 1:
+        print(f'Fuzzing all APIs from {args.fuzz_ip}:{args.fuzz_port} '
+              f'to the hub at {args.hub_ip} with {args.workers} workers')
+        
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            futures = [
+                executor.submit(fuzz_api_function, api, func, args, port_number)
+                for api in FUZZING_API_CHOICES
+                for func in FUNC_SUM.get(api, ())
+            ]
+            for future in as_completed(futures):
+                if not future.result():
+                    # Stop scheduling further pairs, as the sequential path does
+                    for pending in futures:
+                        pending.cancel()
+                    # Cancelled futures would raise CancelledError from result()
+                    break
+        return
     
     # Iterate through each API
     for api in FUZZING_API_CHOICES:
@@ -102,55 +274,9 @@ def random_fuzzing(args: argparse.Namespace) -> None:
               f'to the hub at {args.hub_ip}')
         
         # Iterate through each function in the API
-        for func in FUNC_SUM.get(api, []):
-            curr_round = int(args.round)
-            log_folder = os.path.join(DEFAULT_LOGS_PATH, f'{api}-{func}-')
-            
-            print(f'Received port number {port_number} from {args.fuzz_port}')
-            print(f'Starting fuzzing {api} {func}...')
-            
-            # Execute fuzzing rounds
-            while curr_round <= int(args.total_round):
-                print(f"##### Fuzzing Round: {curr_round} #####")
-                
-                # Determine test file path
-                if EXT_JSON in args.test_file:
-                    test_file = args.test_file
-                else:
-                    test_file = f"{args.test_file}{api}-{curr_round}{func}{EXT_JSON}"
-                
-                # Load test cases
-                test_cases = render_test_cases_file(test_file)
-                
-                if not test_cases:
-                    print("No test cases found. Exiting.")
-                    return
-                
-                # Execute each test case
-                for test_case in test_cases:
-                    json_message = build_json_request(api, test_case)
-                    formatted_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-                    
-                    print(f"{formatted_time} testing {json_message.Function_Name} of "
-                          f"{json_message.API_Name} for \"{json_message.Description[:-1]}\", "
-                          f"awaiting response...")
-                    print("Code snippets:")
-                    for code in json_message.Code_Snippets:
-                        print(code)
-                    
-                    # Send test case to hub
-                    send_message(
-                        args.hub_ip,
-                        port_number,
-                        json.dumps(json_message.__dict__)
-                    )
-                
-                curr_round += 1
-            
-            # Process results and generate next round cases
-            # Note: log_validation and generate_cases_scd would be imported
-            # from appropriate modules in a complete implementation
-            print(f"Fuzzing completed for {api} {func}")
+        for func in FUNC_SUM.get(api, ()):
+            if not fuzz_api_function(api, func, args, port_number):
+                return
 
 
 def case_fuzzing(args: argparse.Namespace) -> None:
@@ -169,42 +295,58 @@ def case_fuzzing(args: argparse.Namespace) -> None:
               - hub_ip: IP address of SmartThings hub
               - round: Round number for logging
               - log_file_name_st: Name for SmartThings log file
+              - max_in_flight: Maximum number of concurrent hub requests
     """
     fuzzing_api_name = args.api_name
     print(f'Fuzzing the API "{fuzzing_api_name}" from {args.fuzz_ip}:{args.fuzz_port} '
           f'to the hub at {args.hub_ip}')
     
     # Start server to receive port number
-    port_number = start_server(args.fuzz_ip, int(args.fuzz_port))
+    port_number = start_server(args.fuzz_ip, args.fuzz_port)
     print(f'Received port number {port_number} from {args.fuzz_port}\n')
     
-    # Load test cases
+    # Execute each test case as it is loaded
     test_file = args.test_file
-    test_cases = render_test_cases_file(test_file)
+    with HubClient(args.hub_ip, port_number) as hub_client:
+        case_count = 0
+        pending_messages = []
+        for test_case in render_test_cases_file(test_file):
+            case_count += 1
+            json_message = build_json_request(args.api_name, test_case)
+            
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    '%s testing %s of %s: %s for "%s"\n'
+                    'Code snippets:\n%s',
+                    format_timestamp(),
+                    json_message['Function_Name'],
+                    json_message['Test_Case'],
+                    json_message['API_Name'],
+                    json_message['Description'][:-1],
+                    '\n'.join(map(str, json_message.get('Code_Snippets', [])))
+                )
+            
+            # Send test case to hub, or add it to the next concurrent window
+            if args.max_in_flight > 1:
+                pending_messages.append(json_message)
+                if len(pending_messages) >= args.max_in_flight:
+                    send_test_case_window(args.hub_ip, port_number,
+                                          pending_messages, args.max_in_flight)
+                    pending_messages = []
+            else:
+                hub_client.send(dumps_json_bytes(json_message))
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug('%s received response for %s of %s', format_timestamp(),
+                                 json_message['Function_Name'], json_message['API_Name'])
+        
+        if pending_messages:
+            send_test_case_window(args.hub_ip, port_number,
+                                  pending_messages, args.max_in_flight)
     
-    if not test_cases:
+    if not case_count:
         print("No test cases found. Exiting.")
         return
     
-    # Execute each test case
-    for test_case in test_cases:
-        json_message = build_json_request(args.api_name, test_case)
-        formatted_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-        
-        print(f"{formatted_time} testing {json_message.Function_Name} of "
-              f"{json_message.Test_Case}: {json_message.API_Name} for "
-              f"\"{json_message.Description[:-1]}\", awaiting response...")
-        print("Code snippets:")
-        for code in json_message.Code_Snippets:
-            print(code)
-        
-        # Send test case to hub
-        send_message(
-            args.hub_ip,
-            port_number,
-            json.dumps(json_message.__dict__)
-        )
-    
     print("Case fuzzing completed.")
 
 
@@ -244,13 +386,13 @@ def create_argument_parser() -> argparse.ArgumentParser:
     )
     parser.add_argument(
         "--round",
-        type=str,
+        type=int,
         default=DEFAULT_ROUND,
         help="The number of the round, corresponding to the cases generated custom_id"
     )
     parser.add_argument(
         "--total_round",
-        type=str,
+        type=int,
         default=DEFAULT_TOTAL_ROUNDS,
         help="The total number of rounds to run"
     )
@@ -286,10 +428,31 @@ def create_argument_parser() -> argparse.ArgumentParser:
     )
     parser.add_argument(
         "--fuzz_port",
-        type=str,
+        type=int,
         default=DEFAULT_FUZZ_PORT,
         help="Fuzzing port on fuzzing desktop"
     )
+    parser.add_argument(
+        "--max_in_flight",
+        type=int,
+        default=DEFAULT_MAX_IN_FLIGHT,
+        help="Maximum number of test cases sent to the hub concurrently "
+             "(1 keeps the edge driver log in test case order)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help="Number of API/function pairs fuzzed concurrently in random fuzzing mode "
+             "(1 keeps the edge driver log in test case order)"
+    )
+    parser.add_argument(
+        "--log_level",
+        type=str.upper,
+        default=DEFAULT_LOG_LEVEL,
+        choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"],
+        help="Logging level; DEBUG prints every test case and its code snippets"
+    )
     parser.add_argument(
         "--llm_model",
         type=str,
@@ -306,9 +469,20 @@ def create_argument_parser() -> argparse.ArgumentParser:
     return parser
 
 
+def configure_logging(level: str) -> None:
+    """
+    Configure console logging for a fuzzing run.
+    
+    Args:
+        level: Logging level name (e.g. "DEBUG", "INFO")
+    """
+    logging.basicConfig(level=level, format='%(message)s', stream=sys.stdout)
+
+
 if __name__ == "__main__":
     parser = create_argument_parser()
     args = parser.parse_args()
+    configure_logging(args.log_level)
     
     # Execute fuzzing based on mode
     if args.case_fuzzing:
@@ -7,21 +7,43 @@ extracting Lua code, and organizing output files.
 
 import os
 import json
+import random
 import re
-from typing import Optional, Dict, Any
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Optional, Dict, Any, List, Set, Tuple
 
 try:
     from openai import OpenAI
 except ImportError:
     OpenAI = None
 
-from config.constants import ENV_OPENAI_API_KEY
+from config.constants import (
+    ENV_OPENAI_API_KEY,
+    DEFAULT_FILE_IO_WORKERS,
+    BATCH_MAX_FILE_BYTES,
+    BATCH_MAX_REQUESTS
+)
+from utils.json_processor import loads_json
 
+logger = logging.getLogger(__name__)
 
+# Fenced ```lua ... ``` blocks in model responses
+_LUA_BLOCK_RE = re.compile(r"```lua(.*?)```", re.DOTALL)
+
+
+@lru_cache(maxsize=1)
 def get_openai_client() -> Any:
     """
     Get an initialized OpenAI client.
     
+    The client is created once and shared, so its connection pool is
+    reused across uploads, batch creation and status polling. Call
+    get_openai_client.cache_clear() to pick up a changed API key.
+    
     Returns:
         OpenAI client instance
         
@@ -49,10 +71,70 @@ def extract_lua_code(response_text: str) -> str:
     Returns:
         Extracted Lua code as string
     """
-    lua_blocks = re.findall(r"```lua(.*?)```", response_text, re.DOTALL)
+    if "```" not in response_text:
+        return response_text.strip()
+    lua_blocks = _LUA_BLOCK_RE.findall(response_text)
     return "\n".join(block.strip() for block in lua_blocks) if lua_blocks else response_text.strip()
 
 
+def _parse_batch_entry(line: str, line_number: int, out_folder: str) -> Optional[Tuple[str, str]]:
+    """
+    Parse one line of a batch output file into a Lua file path and its code.
+    
+    Args:
+        line: JSONL line from the batch output file
+        line_number: 1-based line number, used in error messages
+        out_folder: Base folder for output files
+        
+    Returns:
+        Tuple of (lua_filepath, lua_code), or None if the entry is unusable
+    """
+    try:
+        entry = loads_json(line)
+    except json.JSONDecodeError as e:
+        print(f"Error decoding JSON line {line_number}: {e}")
+        return None
+
+    # Extract response content
+    raw_response_text = (
+        entry.get("response", {})
+             .get("body", {})
+             .get("choices", [{}])[0]
+             .get("message", {})
+             .get("content", "")
+             .strip()
+    )
+    
+    lua_code = extract_lua_code(raw_response_text) if raw_response_text else ""
+    if not lua_code:
+        print(f"Warning: No content in response for {entry.get('custom_id', 'unknown')}")
+        return None
+
+    # Parse custom_id to determine output path
+    custom_id = entry.get("custom_id", "unknown__unknown__output.lua")
+    parts = custom_id.split("__")
+    if len(parts) == 3:
+        _, api_name, lua_filename = parts
+    else:
+        print(f"Warning: Invalid custom_id format: {custom_id}")
+        return None
+
+    return os.path.join(out_folder, api_name, lua_filename), lua_code
+
+
+def _write_lua_file(lua_filepath: str, lua_code: str) -> None:
+    """
+    Write converted Lua code to a file.
+    
+    Args:
+        lua_filepath: Destination file path (its directory must exist)
+        lua_code: Lua code to write
+    """
+    with open(lua_filepath, "w", encoding="utf-8") as lua_file:
+        lua_file.write(lua_code)
+    logger.debug("Stored converted Lua code: %s", lua_filepath)
+
+
 def process_batch_output(
     client: Any,
     output_file_id: str,
@@ -61,8 +143,10 @@ def process_batch_output(
     """
     Process batch API output file and extract Lua code.
     
-    This function downloads the batch output file, extracts Lua code from
-    responses, and saves them to organized files.
+    This function streams the batch output file, extracts Lua code from
+    responses, and saves them to organized files. Each entry is written
+    as it arrives, through a thread pool with a bounded number of pending
+    writes, so memory use does not grow with the size of the batch.
     
     Args:
         client: OpenAI client instance
@@ -72,92 +156,106 @@ def process_batch_output(
     try:
         print(f"Fetching batch output file: {output_file_id}")
 
-        # Retrieve file content
-        response = client.files.content(output_file_id)
-
-        try:
-            file_content = response.read().decode("utf-8")
-        except Exception as e:
-            print(f"Error decoding response: {e}")
-            return
-
         print("Processing batch results...")
 
-        for i, line in enumerate(file_content.strip().split("\n")):
-            try:
-                entry = json.loads(line)
-            except json.JSONDecodeError as e:
-                print(f"Error decoding JSON line {i + 1}: {e}")
-                continue
-
-            # Extract response content
-            raw_response_text = (
-                entry.get("response", {})
-                     .get("body", {})
-                     .get("choices", [{}])[0]
-                     .get("message", {})
-                     .get("content", "")
-                     .strip()
-            )
-            
-            lua_code = extract_lua_code(raw_response_text)
-            if not lua_code:
-                print(f"Warning: No content in response for {entry.get('custom_id', 'unknown')}")
-                continue
-
-            # Parse custom_id to determine output path
-            custom_id = entry.get("custom_id", "unknown__unknown__output.lua")
-            parts = custom_id.split("__")
-            if len(parts) == 3:
-                _, api_name, lua_filename = parts
-            else:
-                print(f"Warning: Invalid custom_id format: {custom_id}")
-                continue
-
-            # Create output directory structure
-            api_dir = os.path.join(out_folder, api_name)
-            os.makedirs(api_dir, exist_ok=True)
-
-            # Write Lua code to file
-            lua_filepath = os.path.join(api_dir, lua_filename)
-            with open(lua_filepath, "w", encoding="utf-8") as lua_file:
-                lua_file.write(lua_code)
-
-            print(f"Stored converted Lua code: {lua_filepath}")
+        created_dirs: Set[str] = set()
+        # Last write submitted per file, so a later entry for the same file
+        # is written after the earlier one and wins, as with sequential writes
+        last_writes: Dict[str, Future] = {}
+        pending_slots = threading.BoundedSemaphore(DEFAULT_FILE_IO_WORKERS * 2)
+        
+        with ThreadPoolExecutor(max_workers=DEFAULT_FILE_IO_WORKERS) as executor, \
+                client.files.with_streaming_response.content(output_file_id) as response:
+            for i, line in enumerate(response.iter_lines()):
+                if not line.strip():
+                    continue
+                parsed = _parse_batch_entry(line, i + 1, out_folder)
+                if not parsed:
+                    continue
+                lua_filepath, lua_code = parsed
+                
+                # Create output directory structure once per API
+                api_dir = os.path.dirname(lua_filepath)
+                if api_dir not in created_dirs:
+                    os.makedirs(api_dir, exist_ok=True)
+                    created_dirs.add(api_dir)
+                
+                previous = last_writes.get(lua_filepath)
+                if previous is not None:
+                    previous.result()
+                
+                pending_slots.acquire()
+                future = executor.submit(_write_lua_file, lua_filepath, lua_code)
+                future.add_done_callback(lambda _: pending_slots.release())
+                last_writes[lua_filepath] = future
+        
+        # Surface any write errors
+        for future in last_writes.values():
+            future.result()
 
+        print(f"Stored {len(last_writes)} converted Lua files.")
         print("Batch processing complete.")
 
     except Exception as e:
         print(f"Error processing batch output: {e}")
 
 
+def _backoff_delay(attempt: int, base: float, factor: float, max_delay: float) -> float:
+    """
+    Compute an exponential backoff delay with jitter.
+    
+    Args:
+        attempt: Number of consecutive waits so far
+        base: Delay for the first wait, in seconds
+        factor: Multiplier applied per attempt
+        max_delay: Upper bound on the delay before jitter, in seconds
+        
+    Returns:
+        Seconds to wait
+    """
+    return min(max_delay, base * (factor ** attempt)) * random.uniform(0.5, 1.5)
+
+
 def check_batch_results(
     batch_id: str,
     out_folder: str = "deeper/round1",
-    check_interval: int = 10
+    check_interval: float = 5,
+    max_interval: float = 300,
+    backoff_factor: float = 1.5,
+    max_wait: Optional[float] = None,
+    max_errors: int = 10
 ) -> Optional[str]:
     """
     Check batch job status and process results when complete.
     
-    This function polls the batch job status and automatically processes
-    the results when the batch completes.
+    This function polls the batch job status with exponential backoff and
+    jitter, and automatically processes the results when the batch
+    completes. The backoff resets whenever the batch status changes.
     
     Args:
         batch_id: Batch job ID
         out_folder: Output folder for processed results
-        check_interval: Seconds to wait between status checks
+        check_interval: Seconds to wait before the first re-check
+        max_interval: Maximum seconds to wait between status checks
+        backoff_factor: Multiplier applied to the wait after each check
+        max_wait: Give up after this many seconds (None waits indefinitely)
+        max_errors: Give up after this many consecutive retrieval errors
         
     Returns:
         Output file ID if successful, None otherwise
     """
-    import time
-    
     client = get_openai_client()
     
+    deadline = time.monotonic() + max_wait if max_wait is not None else None
+    attempt = 0
+    errors = 0
+    last_status = None
+    
     while True:
         try:
             batch_info = client.batches.retrieve(batch_id)
             status = batch_info.status
+            errors = 0
             print(f"Batch Status: {status}")
 
             if status == "completed":
@@ -175,11 +273,77 @@ def check_batch_results(
                 print(f"Batch job failed or was cancelled. Status: {status}")
                 return None
 
+            if status != last_status:
+                last_status = status
+                attempt = 0
+            delay = _backoff_delay(attempt, check_interval, backoff_factor, max_interval)
+            attempt += 1
+
         except Exception as e:
             print(f"Error retrieving batch status: {e}")
+            errors += 1
+            if errors >= max_errors:
+                print(f"Giving up after {errors} consecutive errors.")
+                return None
+            delay = _backoff_delay(errors - 1, check_interval, backoff_factor, max_interval)
+
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                print(f"Batch {batch_id} not finished after {max_wait} seconds.")
+                return None
+            delay = min(delay, remaining)
+
+        print(f"Waiting for batch results... Retrying in {delay:.0f} seconds.")
+        time.sleep(delay)
+
 
-        print(f"Waiting for batch results... Retrying in {check_interval} seconds.")
-        time.sleep(check_interval)
+def split_jsonl_file(
+    jsonl_file: str,
+    max_bytes: int = BATCH_MAX_FILE_BYTES,
+    max_requests: int = BATCH_MAX_REQUESTS
+) -> List[str]:
+    """
+    Split a JSONL file into parts that fit within batch input limits.
+    
+    Args:
+        jsonl_file: Path to JSONL file containing batch requests
+        max_bytes: Maximum size of each part in bytes
+        max_requests: Maximum number of requests in each part
+        
+    Returns:
+        List of JSONL file paths; just jsonl_file if it is within limits
+    """
+    if os.path.getsize(jsonl_file) <= max_bytes:
+        with open(jsonl_file, "rb") as f:
+            if sum(1 for _ in f) <= max_requests:
+                return [jsonl_file]
+    
+    stem, ext = os.path.splitext(jsonl_file)
+    part_files = []
+    part = None
+    part_bytes = 0
+    part_requests = 0
+    
+    try:
+        with open(jsonl_file, "rb") as f:
+            for line in f:
+                if part is None or part_bytes + len(line) > max_bytes or part_requests >= max_requests:
+                    if part is not None:
+                        part.close()
+                    part_files.append(f"{stem}-part{len(part_files) + 1}{ext}")
+                    part = open(part_files[-1], "wb")
+                    part_bytes = 0
+                    part_requests = 0
+                part.write(line)
+                part_bytes += len(line)
+                part_requests += 1
+    finally:
+        if part is not None:
+            part.close()
+    
+    print(f"Split {jsonl_file} into {len(part_files)} batch files.")
+    return part_files
 
 
 def create_batch_from_jsonl(
@@ -189,6 +353,9 @@ def create_batch_from_jsonl(
     """
     Create a batch job from a JSONL file.
     
+    Files over the batch input size or request-count limit are rejected
+    before upload; use split_jsonl_file to divide them first.
+    
     Args:
         jsonl_file: Path to JSONL file containing batch requests
         job: Job identifier for metadata
@@ -199,10 +366,21 @@ def create_batch_from_jsonl(
     client = get_openai_client()
     
     try:
-        upload_response = client.files.create(
-            file=open(jsonl_file, "rb"),
-            purpose="batch"
-        )
+        file_size = os.path.getsize(jsonl_file)
+        if file_size > BATCH_MAX_FILE_BYTES:
+            print(f"Error: {jsonl_file} is {file_size} bytes, over the "
+                  f"{BATCH_MAX_FILE_BYTES} byte batch limit. Split it with split_jsonl_file.")
+            return None
+        
+        with open(jsonl_file, "rb") as f:
+            request_count = sum(1 for _ in f)
+        if request_count > BATCH_MAX_REQUESTS:
+            print(f"Error: {jsonl_file} has {request_count} requests, over the "
+                  f"{BATCH_MAX_REQUESTS} request batch limit. Split it with split_jsonl_file.")
+            return None
+        
+        with open(jsonl_file, "rb") as f:
+            upload_response = client.files.create(file=f, purpose="batch")
         file_id = upload_response.id
         print(f"File uploaded with ID: {file_id}")
 
@@ -217,4 +395,3 @@ def create_batch_from_jsonl(
     except Exception as e:
         print(f"Error creating batch: {e}")
         return None
-
@@ -6,10 +6,11 @@ log analysis, iterative case generation, and batch processing.
 """
 
 import os
-import json
+import logging
 import subprocess
+import textwrap
 import time
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Set
 
 try:
     from openai import OpenAI
@@ -19,12 +20,113 @@ except ImportError:
 from config.api_config import FUZZING_API_CHOICES, FUNC_SUM
 from config.constants import ENV_OPENAI_API_KEY
 from utils.case_extractor import extract_log_content
+from utils.json_processor import dumps_json_bytes
 from deeper.batch_processor import (
     get_openai_client,
     create_batch_from_jsonl,
-    check_batch_results
+    check_batch_results,
+    split_jsonl_file
 )
 
+logger = logging.getLogger(__name__)
+
+# Prompt for converting extracted test cases to pcall()-wrapped Lua
+CONVERSION_PROMPT_TEMPLATE = textwrap.dedent("""
+    Convert the following test cases to Lua. Each line contains a fuzzing test case,
+    possibly with multiple code snippets separated by `;`. Revise each case ensuring:
+    1. Each case runs inside `pcall()` to catch errors.
+    2. If `pcall` fails, print an error message in Lua.
+
+    Example format:
+    ```lua
+    success, result = pcall(MgmtBindRequest.from_values, {{}}, coroutine.create(function() end))
+    if not success then print("Test Case: Coroutine as start_index - Error:", result) end```
+    Now, convert the following: {code_snippets}
+""").strip()
+
+# First deeper-round prompt: analyze the previous round's cases and logs.
+# The API context is the same for every function of an API, so it is a
+# separate template appended to the per-function part.
+DEEPER_ANALYSIS_PROMPT_TEMPLATE = textwrap.dedent("""
+    You are a security expert analyzing logs from a smartthings edge driver.
+    ## Context
+    Code snippets given to fuzz:
+    {random_fuzzing_case}
+    Log of Edge Driver:
+    {edge_driver_log}
+""").lstrip()
+
+DEEPER_API_CONTEXT_TEMPLATE = textwrap.dedent("""
+    API code:
+    {api_code}
+    API doc:
+    {api_doc}
+    Based on the above logs, please analyze if any potential vulnerabilities were found
+    in the application or driver. Specifically, look for any abnormal behaviors, crash
+    reports, memory leaks, or security issues. After that, please conclude the potential
+    fuzzing directions based on the logs, starting with "Fuzzing Directions:". Please note
+    that all testing code snippets in the Edge Driver Log are called with the function pcall().
+""").strip()
+
+# Second deeper-round prompt: mutate new cases from the fuzzing directions
+DEEPER_MUTATION_PROMPT = textwrap.dedent("""
+    As the Fuzzing Directions you provided, please mutate at least 10 fuzzing cases.
+    Based on the edge driver log, please avoid to mutate the fuzzing cases that couldn't
+    pass the data validation. In other words, make sure to consider any validation
+    requirements mentioned in the API documentation while mutating the fuzzing cases that
+    could pass the validation while exploring the potential vulnerabilities.
+    You may start from the fuzzing cases that run successfully in the edge driver log.
+    (Note that the order of the fuzzing cases in the log is the same as the order of the
+    fuzzing cases in the code snippets.)
+    Please generate the lua code with pcall() for each case. You may only include the
+    code snippets that would be run.
+    Note that a valid IEEE address is in format of "\\x00\\x00\\x00\\x00\\x00\\x00\\x00\\x00".
+""").strip()
+
+
+# Stand-in for the first deeper prompt, spliced in after encoding
+_PROMPT_PLACEHOLDER = "{formatted_prompt}"
+_PROMPT_PLACEHOLDER_JSON = dumps_json_bytes(_PROMPT_PLACEHOLDER)
+
+
+def _json_fragment(text: str) -> bytes:
+    """
+    JSON-encode a string without its surrounding quotes.
+    
+    Fragments concatenate into the encoding of the concatenated strings,
+    so large invariant text only has to be encoded once.
+    
+    Args:
+        text: String to encode
+        
+    Returns:
+        Encoded string contents as bytes
+    """
+    return dumps_json_bytes(text)[1:-1]
+
+
+def _list_file_stems(directory: str, extension: str) -> Set[str]:
+    """
+    List the names, without extension, of files in a directory.
+    
+    Args:
+        directory: Directory to scan
+        extension: File extension to match (e.g. ".lua")
+        
+    Returns:
+        Set of file names with the extension stripped; empty if the
+        directory does not exist
+    """
+    try:
+        with os.scandir(directory) as entries:
+            return {
+                entry.name[:-len(extension)]
+                for entry in entries
+                if entry.name.endswith(extension) and entry.is_file()
+            }
+    except OSError:
+        return set()
+
 
 def generate_jsonl_for_conversion(
     input_base_folder: str = "deeper",
@@ -43,7 +145,7 @@ def generate_jsonl_for_conversion(
     Returns:
         Path to generated JSONL file
     """
-    with open(output_jsonl_file, "w", encoding="utf-8") as jsonl_file:
+    with open(output_jsonl_file, "wb") as jsonl_file:
         request_count = 0
         
         for api_name in FUZZING_API_CHOICES:
@@ -51,49 +153,45 @@ def generate_jsonl_for_conversion(
             if not os.path.isdir(api_dir):
                 continue
 
-            for filename in os.listdir(api_dir):
-                if filename.endswith(".txt"):
-                    txt_filepath = os.path.join(api_dir, filename)
-
-                    with open(txt_filepath, "r", encoding="utf-8") as file:
-                        code_snippets = file.read().strip()
-
-                    if not code_snippets:
-                        print(f"Skipping empty file: {txt_filepath}")
-                        continue
-
-                    formatted_prompt = f"""
-                        Convert the following test cases to Lua. Each line contains a fuzzing test case, 
-                        possibly with multiple code snippets separated by `;`. Revise each case ensuring:
-                        1. Each case runs inside `pcall()` to catch errors.
-                        2. If `pcall` fails, print an error message in Lua.
-
-                        Example format:
-                        ```lua
-                        success, result = pcall(MgmtBindRequest.from_values, {{}}, coroutine.create(function() end))
-                        if not success then print("Test Case: Coroutine as start_index - Error:", result) end```
-                        Now, convert the following: {code_snippets} 
-                    """
-
-                    custom_id = f"request-{request_count}__{api_name}__{filename.replace('.txt', '.lua')}"
-                    json_entry = {
-                        "custom_id": custom_id,
-                        "method": "POST",
-                        "url": "/v1/chat/completions",
-                        "body": {
-                            "model": "gpt-4o-mini",
-                            "messages": [
-                                {"role": "system", "content": "You are a Lua expert."},
-                                {"role": "user", "content": formatted_prompt}
-                            ],
-                            "temperature": 0.1
-                        }
+            with os.scandir(api_dir) as entries:
+                txt_entries = [
+                    entry for entry in entries
+                    if entry.name.endswith(".txt") and entry.is_file(follow_symlinks=False)
+                ]
+
+            for entry in txt_entries:
+                filename = entry.name
+                txt_filepath = entry.path
+
+                with open(txt_filepath, "r", encoding="utf-8") as file:
+                    code_snippets = file.read().strip()
+
+                if not code_snippets:
+                    print(f"Skipping empty file: {txt_filepath}")
+                    continue
+
+                formatted_prompt = CONVERSION_PROMPT_TEMPLATE.format(code_snippets=code_snippets)
+
+                custom_id = f"request-{request_count}__{api_name}__{filename.replace('.txt', '.lua')}"
+                json_entry = {
+                    "custom_id": custom_id,
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": {
+                        "model": "gpt-4o-mini",
+                        "messages": [
+                            {"role": "system", "content": "You are a Lua expert."},
+                            {"role": "user", "content": formatted_prompt}
+                        ],
+                        "temperature": 0.1
                     }
+                }
 
-                    jsonl_file.write(json.dumps(json_entry) + "\n")
-                    request_count += 1
-                    print(f"Added batch request: {json_entry['custom_id']}")
+                jsonl_file.write(dumps_json_bytes(json_entry) + b"\n")
+                request_count += 1
+                logger.debug("Added batch request: %s", custom_id)
     
+    print(f"Added {request_count} batch requests to {output_jsonl_file}")
     return output_jsonl_file
 
 
@@ -122,7 +220,7 @@ def deeper_generate_jsonl(
     api_doc_folder = os.path.join(api_source_folder, "api_docs")
     request_count = 0
     
-    with open(output_jsonl_file, "w", encoding="utf-8") as jsonl_file:
+    with open(output_jsonl_file, "wb") as jsonl_file:
         for api in FUZZING_API_CHOICES:
             api_code_file = os.path.join(api_code_folder, api + ".lua")
             temp = api.replace("/", "-")
@@ -137,11 +235,21 @@ def deeper_generate_jsonl(
             with open(api_code_file, encoding='utf-8') as f2:
                 api_code = f2.read()
             
-            for func in FUNC_SUM.get(api, []):
+            # The API code and doc make up most of every request for this API;
+            # encode that part of the first prompt once and reuse the bytes
+            api_context_json = _json_fragment(
+                DEEPER_API_CONTEXT_TEMPLATE.format(api_code=api_code, api_doc=api_doc)
+            )
+            
+            # One directory scan per API instead of two stat calls per function
+            fuzzing_funcs = _list_file_stems(os.path.join(fuzzing_folder, api), ".lua")
+            log_funcs = _list_file_stems(os.path.join(log_folder, api), ".log")
+            
+            for func in FUNC_SUM.get(api, ()):
                 fuzzing_cases_file = os.path.join(fuzzing_folder, api, func + ".lua")
                 edge_driver_log_file = os.path.join(log_folder, api, func + ".log")
                 
-                if not (os.path.exists(fuzzing_cases_file) and os.path.exists(edge_driver_log_file)):
+                if not (func in fuzzing_funcs and func in log_funcs):
                     print(f"Error: files {fuzzing_cases_file} or {edge_driver_log_file} doesn't exist")
                     continue
 
@@ -151,39 +259,11 @@ def deeper_generate_jsonl(
                     edge_driver_log = f4.read()
 
                 # First prompt: Analyze logs
-                formatted_prompt = f"""
-                    You are a security expert analyzing logs from a smartthings edge driver. 
-                    ## Context 
-                    Code snippets given to fuzz:
-                    {random_fuzzing_case}
-                    Log of Edge Driver:
-                    {edge_driver_log}
-                    API code:
-                    {api_code}
-                    API doc:
-                    {api_doc}
-                    Based on the above logs, please analyze if any potential vulnerabilities were found 
-                    in the application or driver. Specifically, look for any abnormal behaviors, crash 
-                    reports, memory leaks, or security issues. After that, please conclude the potential 
-                    fuzzing directions based on the logs, starting with "Fuzzing Directions:". Please note 
-                    that all testing code snippets in the Edge Driver Log are called with the function pcall().
-                """
-                
-                # Second prompt: Generate new cases
-                second_prompt = f"""
-                    As the Fuzzing Directions you provided, please mutate at least 10 fuzzing cases.
-                    Based on the edge driver log, please avoid to mutate the fuzzing cases that couldn't 
-                    pass the data validation. In other words, make sure to consider any validation 
-                    requirements mentioned in the API documentation while mutating the fuzzing cases that 
-                    could pass the validation while exploring the potential vulnerabilities.
-                    You may start from the fuzzing cases that run successfully in the edge driver log. 
-                    (Note that the order of the fuzzing cases in the log is the same as the order of the 
-                    fuzzing cases in the code snippets.)
-                    Please generate the lua code with pcall() for each case. You may only include the 
-                    code snippets that would be run. 
-                    Note that a valid IEEE address is in format of "\\x00\\x00\\x00\\x00\\x00\\x00\\x00\\x00".
-                """
-                
+                prompt_head = DEEPER_ANALYSIS_PROMPT_TEMPLATE.format(
+                    random_fuzzing_case=random_fuzzing_case,
+                    edge_driver_log=edge_driver_log
+                )
+
                 custom_id = f"request-{request_count}__{api}__{func}.lua"
                 json_entry = {
                     "custom_id": custom_id,
@@ -193,36 +273,64 @@ def deeper_generate_jsonl(
                         "model": "gpt-4o",
                         "messages": [
                             {"role": "system", "content": "You are a Lua expert."},
-                            {"role": "user", "content": formatted_prompt},
-                            {"role": "user", "content": second_prompt}
+                            {"role": "user", "content": _PROMPT_PLACEHOLDER},
+                            {"role": "user", "content": DEEPER_MUTATION_PROMPT}
                         ],
                         "temperature": 0.2,
                         "max_tokens": 16000
                     }
                 }
 
-                jsonl_file.write(json.dumps(json_entry) + "\n")
+                prompt_json = b'"' + _json_fragment(prompt_head) + api_context_json + b'"'
+                entry_json = dumps_json_bytes(json_entry).replace(_PROMPT_PLACEHOLDER_JSON, prompt_json, 1)
+
+                jsonl_file.write(entry_json + b"\n")
                 request_count += 1
-                print(f"Added batch request: {json_entry['custom_id']}")
+                logger.debug("Added batch request: %s", custom_id)
     
+    print(f"Added {request_count} batch requests to {output_jsonl_file}")
     return output_jsonl_file
 
 
 def run_command(
     command: str,
     input_sequence: Optional[List[tuple]] = None,
-    delay_after: int = 5
+    delay_after: int = 5,
+    pace: bool = True,
+    timeout: Optional[float] = None
 ) -> None:
     """
     Run a shell command with optional input sequence.
     
+    By default each input line is written after its delay and stdin is
+    held open for delay_after seconds, for commands that need time between
+    inputs. With pace=False, all input lines are written to the command's
+    stdin at once and the command is waited on.
+    
     Args:
         command: Command to run
         input_sequence: List of (input_text, delay) tuples
-        delay_after: Delay after command completes
+        delay_after: Delay after the last input before closing stdin (paced only)
+        pace: Whether to honor the per-input delays
+        timeout: Seconds to wait for the command when not paced
+        
+    Raises:
+        subprocess.TimeoutExpired: If the command does not finish within
+                                   timeout; it is killed first
     """
     process = subprocess.Popen(command, stdin=subprocess.PIPE, text=True, shell=True)
 
+    if not pace:
+        input_text = "".join(text + "\n" for text, _ in input_sequence or ())
+        try:
+            process.communicate(input=input_text, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            # Kill and reap the shell so it is not left running
+            process.kill()
+            process.communicate()
+            raise
+        return
+
     if input_sequence:
         for input_text, delay in input_sequence:
             time.sleep(delay)
@@ -241,15 +349,19 @@ def deeper_round(
     output_folder: str = "deeper/round4",
     output_jsonl: str = "deeper_batch_prompts_rd3.jsonl",
     job_name: str = "deeper_round3"
-) -> Optional[str]:
+) -> Optional[List[str]]:
     """
     Execute a deeper fuzzing round.
     
     This function orchestrates a complete deeper round:
     1. Extract relevant log content
     2. Generate batch requests
-    3. Create and monitor batch job
-    4. Process results
+    3. Create one batch job per batch-sized part, all before polling, so
+       the parts run concurrently
+    4. Monitor each batch and process its results
+    
+    A part that fails to be created or to complete is reported and
+    skipped; results of the other parts are still processed.
     
     Args:
         api_source_folder: Folder containing API sources
@@ -260,7 +372,7 @@ def deeper_round(
         job_name: Job identifier
         
     Returns:
-        Batch ID if successful, None otherwise
+        IDs of the batches whose results were processed, or None if none were
     """
     # Extract log content
     extract_log_content(directory=log_folder)
@@ -273,13 +385,21 @@ def deeper_round(
         output_jsonl_file=output_jsonl
     )
     
-    # Create batch job
-    batch_id = create_batch_from_jsonl(output_jsonl, job=job_name)
-    if not batch_id:
-        return None
+    # Create every batch job first so they are processed in parallel
+    submitted = []
+    for jsonl_part in split_jsonl_file(output_jsonl):
+        batch_id = create_batch_from_jsonl(jsonl_part, job=job_name)
+        if batch_id:
+            submitted.append(batch_id)
+        else:
+            print(f"Failed to create batch for {jsonl_part}; skipping it.")
     
     # Check and process results
-    check_batch_results(batch_id, out_folder=output_folder)
+    batch_ids = []
+    for batch_id in submitted:
+        if check_batch_results(batch_id, out_folder=output_folder):
+            batch_ids.append(batch_id)
+        else:
+            print(f"Batch {batch_id} did not complete; its results were not processed.")
     
-    return batch_id
-
+    return batch_ids or None
@@ -7,13 +7,29 @@ code from HTML and Lua files for analysis and fuzzing case generation.
 
 import os
 import re
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Optional, TextIO
+
+try:
+    from selectolax.parser import HTMLParser
+except ImportError:
+    HTMLParser = None
+
+from config.constants import OUTPUT_BUFFER_SIZE, DEFAULT_FILE_IO_WORKERS
+
+_HTML_TAG_RE = re.compile(r'<[^>]+>')
+_WHITESPACE_RE = re.compile(r'\s+')
 
 
 def extract_html_content(file_path: str) -> str:
     """
     Extract content from HTML files, removing HTML tags and formatting.
     
+    With selectolax installed the document is parsed by its C parser, which
+    also drops <script>/<style> bodies and decodes entities; otherwise tags
+    are stripped with regular expressions.
+    
     Args:
         file_path: Path to HTML file
         
@@ -21,13 +37,16 @@ def extract_html_content(file_path: str) -> str:
         Plain text content extracted from HTML
     """
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-            # Remove HTML tags
-            content = re.sub(r'<[^>]+>', '', content)
-            # Remove multiple spaces and newlines
-            content = re.sub(r'\s+', ' ', content)
-            return content.strip()
+        content = Path(file_path).read_text(encoding='utf-8')
+        if HTMLParser is not None:
+            tree = HTMLParser(content)
+            tree.strip_tags(['script', 'style'])
+            return " ".join(tree.text(separator=' ').split())
+        # Remove HTML tags
+        content = _HTML_TAG_RE.sub('', content)
+        # Remove multiple spaces and newlines
+        content = _WHITESPACE_RE.sub(' ', content)
+        return content.strip()
     except Exception as e:
         return f"Error reading {file_path}: {str(e)}"
 
@@ -43,12 +62,44 @@ def extract_lua_content(file_path: str) -> str:
         Lua file content as string
     """
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return f.read()
+        return Path(file_path).read_text(encoding='utf-8')
     except Exception as e:
         return f"Error reading {file_path}: {str(e)}"
 
 
+def _write_extracted_files(
+    out: TextIO,
+    executor: ThreadPoolExecutor,
+    base_path: str,
+    extension: str,
+    extractor: Callable[[str], str]
+) -> None:
+    """
+    Extract all matching files under a directory and write them in walk order.
+    
+    Files are read concurrently through the executor; executor.map keeps
+    the results in submission order, so the output is deterministic.
+    
+    Args:
+        out: Output file to write to
+        executor: Thread pool used to run the extractor
+        base_path: Directory to walk
+        extension: File extension to include (e.g. ".html")
+        extractor: Function returning the text content of a file
+    """
+    file_paths = [
+        os.path.join(root, file)
+        for root, _, files in os.walk(base_path)
+        for file in files
+        if file.endswith(extension)
+    ]
+    
+    for file_path, content in zip(file_paths, executor.map(extractor, file_paths)):
+        out.write(f"\n--- {os.path.basename(file_path)} ---\n")
+        out.write(content)
+        out.write("\n")
+
+
 def process_directory(
     directory: str,
     output_file: str,
@@ -67,32 +118,21 @@ def process_directory(
         docs_subfolder: Subfolder name containing documentation (default: "docs")
         code_subfolder: Subfolder name containing Lua code (default: "code_exp")
     """
-    with open(output_file, 'w', encoding='utf-8') as out:
+    with open(output_file, 'w', encoding='utf-8', buffering=OUTPUT_BUFFER_SIZE) as out, \
+            ThreadPoolExecutor(max_workers=DEFAULT_FILE_IO_WORKERS) as executor:
         out.write("<folder_contents>\n")
         
         # Process docs directory
         docs_path = os.path.join(directory, docs_subfolder)
         if os.path.exists(docs_path):
             out.write("\n=== Documentation Files ===\n")
-            for root, _, files in os.walk(docs_path):
-                for file in files:
-                    if file.endswith('.html'):
-                        file_path = os.path.join(root, file)
-                        out.write(f"\n--- {file} ---\n")
-                        out.write(extract_html_content(file_path))
-                        out.write("\n")
+            _write_extracted_files(out, executor, docs_path, '.html', extract_html_content)
         
         # Process lua_api_code_v12 directory
         lua_path = os.path.join(directory, code_subfolder)
         if os.path.exists(lua_path):
             out.write("\n=== Lua Source Code Files ===\n")
-            for root, _, files in os.walk(lua_path):
-                for file in files:
-                    if file.endswith('.lua'):
-                        file_path = os.path.join(root, file)
-                        out.write(f"\n--- {file} ---\n")
-                        out.write(extract_lua_content(file_path))
-                        out.write("\n")
+            _write_extracted_files(out, executor, lua_path, '.lua', extract_lua_content)
 
         out.write("</folder_contents>\n")
 
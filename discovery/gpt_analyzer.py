@@ -5,16 +5,75 @@ This module provides utilities for sending API documentation to GPT
 for analysis and identifying fuzzing candidates.
 """
 
+import asyncio
 import os
 import tiktoken
-from typing import Optional
+from functools import lru_cache
+from typing import List, Optional
 
 try:
-    from openai import OpenAI
+    from openai import AsyncOpenAI
 except ImportError:
-    OpenAI = None
+    AsyncOpenAI = None
 
-from config.constants import ENV_OPENAI_API_KEY
+from config.constants import ENV_OPENAI_API_KEY, DEFAULT_LLM_CONCURRENCY
+
+# ASCII lines shorter than this are estimated at ~4 characters per token
+# instead of being tokenized
+SHORT_LINE_LENGTH = 16
+
+
+@lru_cache(maxsize=8)
+def _load_encoding(model: str):
+    """
+    Load the tiktoken encoding for a model, caching successful lookups.
+    
+    Args:
+        model: Model name for tokenization
+        
+    Returns:
+        tiktoken Encoding
+        
+    Raises:
+        Exception: If the model is unknown or the encoding cannot be loaded
+    """
+    return tiktoken.encoding_for_model(model)
+
+
+def _get_encoding(model: str):
+    """
+    Get the tiktoken encoding for a model.
+    
+    Failures are not cached, so a transient download error does not force
+    approximate counting for the rest of the process.
+    
+    Args:
+        model: Model name for tokenization
+        
+    Returns:
+        tiktoken Encoding, or None if it cannot be loaded
+    """
+    try:
+        return _load_encoding(model)
+    except Exception:
+        return None
+
+
+def _estimate_short_tokens(text: str) -> Optional[int]:
+    """
+    Estimate the token count of empty or short ASCII text without tokenizing.
+    
+    Args:
+        text: Text to estimate
+        
+    Returns:
+        Estimated number of tokens, or None if the text needs tokenizing
+    """
+    if not text:
+        return 0
+    if len(text) < SHORT_LINE_LENGTH and text.isascii():
+        return max(1, len(text) // 4)
+    return None
 
 
 def count_tokens(text: str, model: str = "gpt-4") -> int:
@@ -31,12 +90,53 @@ def count_tokens(text: str, model: str = "gpt-4") -> int:
     Raises:
         ImportError: If tiktoken package is not installed
     """
-    try:
-        encoding = tiktoken.encoding_for_model(model)
-        return len(encoding.encode(text))
-    except Exception:
+    estimate = _estimate_short_tokens(text)
+    if estimate is not None:
+        return estimate
+    
+    encoding = _get_encoding(model)
+    if encoding is None:
         # Fallback to approximate counting
         return len(text.split())
+    # Count special-token text such as <|endoftext|> as ordinary text
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def count_line_tokens(lines: List[str], model: str = "gpt-4") -> List[int]:
+    """
+    Count the number of tokens in each of a list of lines.
+    
+    Empty and short ASCII lines are estimated; the remaining lines are
+    tokenized in a single encode_batch call instead of one encode call
+    per line.
+    
+    Args:
+        lines: Lines to count tokens for
+        model: Model name for tokenization
+        
+    Returns:
+        Number of tokens for each line
+    """
+    counts = [_estimate_short_tokens(line) for line in lines]
+    pending = [i for i, count in enumerate(counts) if count is None]
+    if not pending:
+        return counts
+    
+    encoding = _get_encoding(model)
+    if encoding is None:
+        # Fallback to approximate counting
+        for i in pending:
+            counts[i] = len(lines[i].split())
+        return counts
+    
+    tokens = encoding.encode_batch(
+        [lines[i] for i in pending],
+        num_threads=os.cpu_count() or 1,
+        disallowed_special=()
+    )
+    for i, line_tokens in zip(pending, tokens):
+        counts[i] = len(line_tokens)
+    return counts
 
 
 def split_content(content: str, max_tokens: int = 30000) -> list:
@@ -50,29 +150,27 @@ def split_content(content: str, max_tokens: int = 30000) -> list:
     Returns:
         List of content chunks
     """
-    chunks = []
-    current_chunk = ""
-    current_tokens = 0
-    
     # Split by newlines to maintain some structure
     lines = content.split('\n')
     
-    for line in lines:
-        line_tokens = count_tokens(line)
-        
-        if current_tokens + line_tokens > max_tokens:
-            if current_chunk:
-                chunks.append(current_chunk)
-            current_chunk = line + "\n"
+    # Find chunk boundaries from the per-line token counts first, then
+    # join each chunk once instead of growing a string line by line
+    bounds = []
+    start = 0
+    current_tokens = 0
+    
+    for end, line_tokens in enumerate(count_line_tokens(lines)):
+        if current_tokens + line_tokens > max_tokens and end > start:
+            bounds.append((start, end))
+            start = end
             current_tokens = line_tokens
         else:
-            current_chunk += line + "\n"
             current_tokens += line_tokens
     
-    if current_chunk:
-        chunks.append(current_chunk)
+    if start < len(lines):
+        bounds.append((start, len(lines)))
     
-    return chunks
+    return ["\n".join(lines[start:end]) + "\n" for start, end in bounds]
 
 
 def read_prompt_file(file_path: str) -> Optional[str]:
@@ -93,23 +191,74 @@ def read_prompt_file(file_path: str) -> Optional[str]:
         return None
 
 
+async def _analyze_chunks(
+    api_key: str,
+    chunks: List[str],
+    model: str,
+    temperature: float,
+    max_tokens: int,
+    max_concurrency: int
+) -> List[str]:
+    """
+    Send all chunks to GPT concurrently.
+    
+    Args:
+        api_key: OpenAI API key
+        chunks: Content chunks to analyze
+        model: GPT model to use
+        temperature: Temperature parameter
+        max_tokens: Maximum tokens in response
+        max_concurrency: Maximum number of requests in flight
+        
+    Returns:
+        Responses in chunk order
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    
+    async with AsyncOpenAI(api_key=api_key) as client:
+        async def analyze_chunk(i: int, chunk: str) -> str:
+            async with semaphore:
+                print(f"\nProcessing chunk {i+1}/{len(chunks)}...")
+                response = await client.chat.completions.create(
+                    model=model,
+                    messages=[
+                        {"role": "system", 
+                         "content": "You are a security-focused AI assistant analyzing API documentation "
+                                   "and source code for potential vulnerabilities. This is part of a larger "
+                                   "analysis, so focus on the specific content provided."},
+                        {"role": "user", 
+                         "content": f"This is chunk {i+1} of {len(chunks)}. Please analyze the following content:\n\n{chunk}"}
+                    ],
+                    temperature=temperature,
+                    max_tokens=max_tokens
+                )
+            return response.choices[0].message.content
+        
+        # gather returns results in submission order
+        return await asyncio.gather(
+            *(analyze_chunk(i, chunk) for i, chunk in enumerate(chunks))
+        )
+
+
 def send_to_gpt(
     prompt_content: str,
     model: str = "gpt-4.1-2025-04-14",
     temperature: float = 0.4,
-    max_tokens: int = 30000
+    max_tokens: int = 30000,
+    max_concurrency: int = DEFAULT_LLM_CONCURRENCY
 ) -> Optional[str]:
     """
     Send the prompt to GPT and get the response.
     
-    This function handles large prompts by splitting them into chunks
-    and combining the responses.
+    This function handles large prompts by splitting them into chunks,
+    sending the chunks concurrently and combining the responses.
     
     Args:
         prompt_content: Prompt content to send
         model: GPT model to use
         temperature: Temperature parameter
         max_tokens: Maximum tokens in response
+        max_concurrency: Maximum number of chunk requests in flight
         
     Returns:
         Combined response from GPT, or None if error
@@ -118,44 +267,25 @@ def send_to_gpt(
         ImportError: If openai package is not installed
         ValueError: If API key is not set
     """
-    if OpenAI is None:
+    if AsyncOpenAI is None:
         raise ImportError("openai package required. Install with: pip install openai")
     
     api_key = os.environ.get(ENV_OPENAI_API_KEY)
     if not api_key:
         raise ValueError(f"{ENV_OPENAI_API_KEY} environment variable not set")
     
-    client = OpenAI(api_key=api_key)
-    
     try:
         # Split the content into manageable chunks
         chunks = split_content(prompt_content)
-        all_responses = []
-        
-        for i, chunk in enumerate(chunks):
-            print(f"\nProcessing chunk {i+1}/{len(chunks)}...")
-            
-            response = client.chat.completions.create(
-                model=model,
-                messages=[
-                    {"role": "system", 
-                     "content": "You are a security-focused AI assistant analyzing API documentation "
-                               "and source code for potential vulnerabilities. This is part of a larger "
-                               "analysis, so focus on the specific content provided."},
-                    {"role": "user", 
-                     "content": f"This is chunk {i+1} of {len(chunks)}. Please analyze the following content:\n\n{chunk}"}
-                ],
-                temperature=temperature,
-                max_tokens=max_tokens
-            )
-            
-            chunk_response = response.choices[0].message.content
+        all_responses = asyncio.run(_analyze_chunks(
+            api_key, chunks, model, temperature, max_tokens, max_concurrency
+        ))
+        
+        for i, chunk_response in enumerate(all_responses):
             print(f"\nResponse for chunk {i+1}:")
             print("-" * 80)
             print(chunk_response)
             print("-" * 80)
-            
-            all_responses.append(chunk_response)
         
         # Combine all responses
         return "\n\n".join(all_responses)
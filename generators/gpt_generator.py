@@ -7,27 +7,167 @@ It handles API communication, prompt formatting, and response parsing.
 
 import os
 import json
-import re
 import ast
-from typing import Optional, Dict, Any
+import asyncio
+import random
+import sys
+import time
+from functools import lru_cache
+from typing import Optional, Dict, Any, List, Tuple
 from pathlib import Path
 
-try:
-    import openai
-except ImportError:
-    openai = None
+# Imported on first use by _import_openai(); importing openai pulls in
+# httpx and pydantic, which prompt-only callers never need
+openai = None
 
 from generators.prompt_templates import (
     get_case_generation_prompt,
     get_second_round_prompt
 )
 from utils.file_utils import write_in_path
+from utils.json_processor import loads_json, dumps_json
+from utils import gpt_cache
 from config.constants import (
     ENV_OPENAI_API_KEY,
     DEFAULT_GPT_MODEL,
-    DEFAULT_MAX_TOKENS
+    DEFAULT_MAX_TOKENS,
+    DEFAULT_LLM_CONCURRENCY,
+    DEFAULT_LLM_MAX_ATTEMPTS
 )
 
+# Heading that precedes the fuzzing directions in log analysis results
+FUZZING_DIRECTIONS_MARKER = '### Fuzzing Directions:'
+
+SYSTEM_MESSAGE = {
+    "role": "system",
+    "content": "You are a helpful assistant skilled in Software Testing, and exploring vulnerabilities for IoT security."
+}
+
+
+def _extract_first_fenced_block(text: str) -> Optional[str]:
+    """
+    Extract the contents of the first ``` fenced block in a reply.
+    
+    Fences must start a line, and an optional language tag after the
+    opening fence is skipped. The reply is scanned once with str.find.
+    
+    Args:
+        text: Reply text to scan
+        
+    Returns:
+        Block contents including the final newline, or None if no
+        complete fenced block is found
+    """
+    fence = text.find('```')
+    while fence > 0 and text[fence - 1] != '\n':
+        fence = text.find('```', fence + 3)
+    if fence == -1:
+        return None
+    
+    body_start = text.find('\n', fence + 3) + 1
+    if body_start == 0:
+        return None
+    
+    body_end = text.find('\n```', body_start - 1)
+    if body_end == -1:
+        return None
+    return text[body_start:body_end + 1]
+
+
+def _import_openai() -> Any:
+    """
+    Import the openai package on first use.
+    
+    Returns:
+        The openai module
+        
+    Raises:
+        ImportError: If openai package is not installed
+    """
+    global openai
+    if openai is None:
+        try:
+            import openai as openai_module
+        except ImportError:
+            raise ImportError("openai package is required. Install with: pip install openai") from None
+        openai = openai_module
+    return openai
+
+
+def _retry_delay(error: Exception, attempt: int) -> Optional[float]:
+    """
+    Get the backoff delay before retrying a failed GPT request.
+    
+    Rate limits, connection errors and 5xx responses are retried with
+    exponential backoff and jitter, honoring a Retry-After header when
+    the server sends one.
+    
+    Args:
+        error: Exception raised by the request
+        attempt: Zero-based attempt number that failed
+        
+    Returns:
+        Seconds to wait, or None if the error should not be retried
+    """
+    # The caller may have supplied its own client, so openai may not be loaded yet
+    openai_module = _import_openai()
+    if isinstance(error, openai_module.APIStatusError):
+        if error.status_code != 429 and error.status_code < 500:
+            return None
+        retry_after = error.response.headers.get("retry-after")
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+    elif not isinstance(error, openai_module.APIConnectionError):
+        return None
+    return min(60, 2 ** attempt) + random.random()
+
+
+def _create_chat_completion(client: Any, **kwargs: Any) -> Any:
+    """
+    Create a chat completion, retrying transient failures.
+    
+    Args:
+        client: openai.OpenAI client
+        **kwargs: Arguments for client.chat.completions.create
+        
+    Returns:
+        Chat completion response
+    """
+    for attempt in range(DEFAULT_LLM_MAX_ATTEMPTS):
+        try:
+            return client.chat.completions.create(**kwargs)
+        except Exception as e:
+            delay = _retry_delay(e, attempt)
+            if delay is None or attempt == DEFAULT_LLM_MAX_ATTEMPTS - 1:
+                raise
+            print(f"GPT request failed ({e}); retrying in {delay:.1f} seconds...")
+            time.sleep(delay)
+
+
+async def _create_chat_completion_async(client: Any, **kwargs: Any) -> Any:
+    """
+    Create a chat completion asynchronously, retrying transient failures.
+    
+    Args:
+        client: openai.AsyncOpenAI client
+        **kwargs: Arguments for client.chat.completions.create
+        
+    Returns:
+        Chat completion response
+    """
+    for attempt in range(DEFAULT_LLM_MAX_ATTEMPTS):
+        try:
+            return await client.chat.completions.create(**kwargs)
+        except Exception as e:
+            delay = _retry_delay(e, attempt)
+            if delay is None or attempt == DEFAULT_LLM_MAX_ATTEMPTS - 1:
+                raise
+            print(f"GPT request failed ({e}); retrying in {delay:.1f} seconds...")
+            await asyncio.sleep(delay)
+
 
 def request_gpt(message: str, gpt_model: str = DEFAULT_GPT_MODEL) -> str:
     """
@@ -44,42 +184,152 @@ def request_gpt(message: str, gpt_model: str = DEFAULT_GPT_MODEL) -> str:
         ImportError: If openai package is not installed
         ValueError: If API key is not set
     """
-    if openai is None:
-        raise ImportError("openai package is required. Install with: pip install openai")
+    if not message:
+        return ""
+    
+    cache_key = gpt_cache.make_key(gpt_model, message) if gpt_cache.is_enabled() else None
+    if cache_key:
+        cached_reply = gpt_cache.get(cache_key)
+        if cached_reply is not None:
+            print(f"Using cached {gpt_model} response.")
+            print(cached_reply)
+            return cached_reply
+    
+    client = get_client()
+    
+    messages = [SYSTEM_MESSAGE, {
+        "role": "user",
+        "content": message
+    }]
+    
+    print(f"Waiting for {gpt_model}...")
+    
+    stream = _create_chat_completion(
+        client,
+        model=gpt_model,
+        messages=messages,
+        max_tokens=DEFAULT_MAX_TOKENS,
+        stream=True
+    )
+    
+    # Echo the reply as it is generated and join it once at the end
+    reply_parts = []
+    for event in stream:
+        if not event.choices:
+            continue
+        delta = event.choices[0].delta.content
+        if delta:
+            reply_parts.append(delta)
+            sys.stdout.write(delta)
+    sys.stdout.write("\n")
+    reply = "".join(reply_parts)
+    
+    if cache_key and reply:
+        gpt_cache.put(cache_key, reply)
+    
+    return reply
+
+
+@lru_cache(maxsize=1)
+def get_client() -> Any:
+    """
+    Get the shared OpenAI client.
+    
+    The client is created on first use and reused by every request, so
+    its connection pool stays warm. Call get_client.cache_clear() to pick
+    up a changed API key.
+    
+    Returns:
+        openai.OpenAI instance
+        
+    Raises:
+        ImportError: If openai package is not installed
+        ValueError: If API key is not set
+    """
+    _import_openai()
     
     # Get API key from environment
     api_key = os.environ.get(ENV_OPENAI_API_KEY)
     if not api_key:
         raise ValueError(f"{ENV_OPENAI_API_KEY} environment variable not set")
     
-    # Initialize client
-    client = openai.OpenAI(api_key=api_key)
+    return openai.OpenAI(api_key=api_key)
+
+
+def _create_async_client() -> Any:
+    """
+    Create an async OpenAI client.
     
-    messages = [{
-        "role": "system",
-        "content": "You are a helpful assistant skilled in Software Testing, and exploring vulnerabilities for IoT security."
-    }]
+    Returns:
+        openai.AsyncOpenAI instance
+        
+    Raises:
+        ImportError: If openai package is not installed
+        ValueError: If API key is not set
+    """
+    _import_openai()
+    
+    api_key = os.environ.get(ENV_OPENAI_API_KEY)
+    if not api_key:
+        raise ValueError(f"{ENV_OPENAI_API_KEY} environment variable not set")
     
-    if message:
-        messages.append({
-            "role": "user",
-            "content": message
-        })
+    return openai.AsyncOpenAI(api_key=api_key)
+
+
+async def request_gpt_async(
+    message: str,
+    gpt_model: str = DEFAULT_GPT_MODEL,
+    semaphore: Optional[asyncio.Semaphore] = None,
+    client: Any = None
+) -> str:
+    """
+    Send a request to GPT asynchronously and get the response.
+    
+    Args:
+        message: The prompt message to send
+        gpt_model: The GPT model to use
+        semaphore: Optional semaphore bounding concurrent requests
+        client: Optional shared openai.AsyncOpenAI client; a temporary
+            client is created if omitted
         
-        print(f"Waiting for {gpt_model}...")
+    Returns:
+        The response content from GPT
         
-        chat = client.chat.completions.create(
+    Raises:
+        ImportError: If openai package is not installed
+        ValueError: If API key is not set
+    """
+    if not message:
+        return ""
+    
+    if client is None:
+        async with _create_async_client() as temp_client:
+            return await request_gpt_async(message, gpt_model, semaphore, temp_client)
+    
+    cache_key = gpt_cache.make_key(gpt_model, message) if gpt_cache.is_enabled() else None
+    if cache_key:
+        cached_reply = gpt_cache.get(cache_key)
+        if cached_reply is not None:
+            print(f"Using cached {gpt_model} response.")
+            return cached_reply
+    
+    messages = [SYSTEM_MESSAGE, {"role": "user", "content": message}]
+    
+    async with semaphore or asyncio.Semaphore(1):
+        print(f"Waiting for {gpt_model}...")
+        chat = await _create_chat_completion_async(
+            client,
             model=gpt_model,
             messages=messages,
             max_tokens=DEFAULT_MAX_TOKENS
         )
-        
-        reply = chat.choices[0].message.content
-        print(reply)
-        
-        return reply
     
-    return ""
+    reply = chat.choices[0].message.content
+    
+    if cache_key and reply is not None:
+        gpt_cache.put(cache_key, reply)
+    
+    return reply
 
 
 def generate_cases(
@@ -103,11 +353,113 @@ def generate_cases(
     
     response = request_gpt(prompt, chatgpt_model)
     
+    _store_generated_cases(response, dest_dir, dest_filename)
+
+
+def _store_generated_cases(response: str, dest_dir: str, dest_filename: str) -> None:
+    """
+    Save a generated fuzzing case response to file.
+    
+    Args:
+        response: Response content from GPT
+        dest_dir: Destination directory for output file
+        dest_filename: Base filename (without extension) for output
+    """
     Path(dest_dir).mkdir(parents=True, exist_ok=True)
-    write_in_path(json.dumps(response), dest_filename)
+    # The reply is raw markdown; encoding it as a JSON string keeps the
+    # .json file loadable by the json_processor extraction utilities
+    write_in_path(dumps_json(response), dest_filename)
     print(f"Fuzzing file generated and stored at {dest_filename}.json")
 
 
+async def generate_cases_batch(
+    jobs: List[Dict[str, Any]],
+    concurrency: int = DEFAULT_LLM_CONCURRENCY
+) -> None:
+    """
+    Generate fuzzing test cases for several APIs concurrently.
+    
+    Each job holds the keyword arguments of generate_cases (api_doc,
+    api_code, dest_dir, dest_filename and optionally chatgpt_model).
+    All requests share one async client and at most `concurrency` are
+    in flight at a time. From synchronous code, call
+    asyncio.run(generate_cases_batch(jobs)).
+    
+    Args:
+        jobs: Generation jobs
+        concurrency: Maximum number of concurrent GPT requests
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async with _create_async_client() as client:
+        async def run_job(job: Dict[str, Any]) -> None:
+            prompt = get_case_generation_prompt(job["api_doc"], job["api_code"], "")
+            response = await request_gpt_async(
+                prompt,
+                job.get("chatgpt_model", DEFAULT_GPT_MODEL),
+                semaphore=semaphore,
+                client=client
+            )
+            _store_generated_cases(response, job["dest_dir"], job["dest_filename"])
+        
+        await asyncio.gather(*(run_job(job) for job in jobs))
+
+
+@lru_cache(maxsize=1024)
+def resolve_api_paths(api_source: str, api: str) -> Tuple[str, str]:
+    """
+    Get the documentation and source code paths of an API.
+    
+    Results are cached, since every function of an API resolves the
+    same paths.
+    
+    Args:
+        api_source: Path to API source files
+        api: API name
+        
+    Returns:
+        Tuple of (api_doc_file, api_code_file)
+    """
+    return (
+        os.path.join(api_source, 'api_docs', api.replace('/', '-') + '.md'),
+        os.path.join(api_source, 'api_codes', api + '.lua')
+    )
+
+
+@lru_cache(maxsize=256)
+def _read_text_cached(path: str, mtime_ns: int) -> str:
+    """
+    Read a UTF-8 text file, cached by path and modification time.
+    
+    Args:
+        path: File path
+        mtime_ns: File modification time, part of the cache key only
+        
+    Returns:
+        File content
+    """
+    return Path(path).read_text(encoding='utf-8')
+
+
+def read_api_source(path: str) -> str:
+    """
+    Read an API documentation or source code file.
+    
+    Contents are cached and re-read only when the file's modification
+    time changes, so functions of the same API share one read.
+    
+    Args:
+        path: File path
+        
+    Returns:
+        File content
+        
+    Raises:
+        FileNotFoundError: If the file does not exist
+    """
+    return _read_text_cached(path, os.stat(path).st_mtime_ns)
+
+
 def generate_cases_second_round(
     api_source: str,
     api: str,
@@ -132,29 +484,27 @@ def generate_cases_second_round(
     print(f"Generating second round fuzzing file...")
     
     # Load API documentation and code
-    api_doc_file = os.path.join(api_source, 'api_docs', api.replace('/', '-') + '.md')
-    api_code_file = os.path.join(api_source, 'api_codes', api + '.lua')
-    
-    api_code = ''
-    api_doc = ''
+    api_doc_file, api_code_file = resolve_api_paths(api_source, api)
     
-    if os.path.exists(api_doc_file) and os.path.exists(api_code_file):
-        with open(api_doc_file, encoding='utf-8') as f1:
-            api_doc = f1.read()
-        with open(api_code_file, encoding='utf-8') as f2:
-            api_code = f2.read()
-    else:
-        print(f"Error: {api_doc_file} or {api_code_file} doesn't exist")
+    try:
+        api_doc = read_api_source(api_doc_file)
+        api_code = read_api_source(api_code_file)
+    except FileNotFoundError as e:
+        print(f"Error: {e.filename} doesn't exist")
         return
     
     # Format previous fuzzing cases
-    fuzzing_cases_content = ''
-    for i in range(len(fuzzing_cases)):
-        fuzzing_cases_content += (f'Case: {i+1}. Description: {fuzzing_cases[i][3]}. '
-                                 f'Code Snippets: {fuzzing_cases[i][4]}\n')
+    fuzzing_cases_content = ''.join(
+        f'Case: {i}. Description: {case[3]}. Code Snippets: {case[4]}\n'
+        for i, case in enumerate(fuzzing_cases, 1)
+    )
     
     # Extract fuzzing directions from results
-    fuzzing_results_contents = fuzzing_results.split('### Fuzzing Directions:')[1] if '### Fuzzing Directions:' in fuzzing_results else fuzzing_results
+    marker_index = fuzzing_results.find(FUZZING_DIRECTIONS_MARKER)
+    if marker_index >= 0:
+        fuzzing_results_contents = fuzzing_results[marker_index + len(FUZZING_DIRECTIONS_MARKER):]
+    else:
+        fuzzing_results_contents = fuzzing_results
     
     # Generate prompt
     prompt = get_second_round_prompt(
@@ -170,14 +520,17 @@ def generate_cases_second_round(
     reply = request_gpt(prompt, chatgpt_model)
     
     # Extract JSON from response
-    pattern = r'^```(?:\w+)?\s*\n(.*?)(?=^```)```'
-    result = re.findall(pattern, reply, re.DOTALL | re.MULTILINE)
+    block = _extract_first_fenced_block(reply)
     
-    if result:
+    if block is not None:
         try:
-            response = ast.literal_eval(result[0])
+            try:
+                response = loads_json(block)
+            except json.JSONDecodeError:
+                # Tolerate Python-literal replies (e.g. single-quoted strings)
+                response = ast.literal_eval(block)
             dest_filename = dest_filename.split('.json')[0] + '-scdRd'
-            write_in_path(json.dumps(response), dest_filename)
+            write_in_path(dumps_json(response), dest_filename)
             print(f"Second round fuzzing file generated and stored at {dest_filename}")
         except (ValueError, SyntaxError) as e:
             print(f"Error parsing response: {e}")
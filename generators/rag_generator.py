@@ -7,34 +7,300 @@ It uses vector stores (FAISS) to retrieve relevant code context for better gener
 
 import os
 import json
-import re
-from typing import Optional, Dict, Any
+import time
+import asyncio
+import random
+import textwrap
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional, Dict, Any, List
 
 try:
+    import faiss
     import langchain
+    import openai
     from langchain.chains.combine_documents import create_stuff_documents_chain
     from langchain.chains import create_retrieval_chain
     from langchain.prompts import PromptTemplate
     from langchain.schema import Document
-    from langchain.text_splitter import RecursiveCharacterTextSplitter
+    from langchain.text_splitter import Language, RecursiveCharacterTextSplitter
     from langchain_openai import OpenAIEmbeddings, ChatOpenAI
     from langchain.vectorstores import FAISS
+    from packaging.version import Version
+    # create_retrieval_chain replaces RetrievalQA from langchain 0.3 on
+    _USE_RETRIEVAL_CHAIN = Version(langchain.__version__) >= Version('0.3')
 except ImportError:
+    faiss = None
     langchain = None
+    openai = None
     create_stuff_documents_chain = None
     create_retrieval_chain = None
     PromptTemplate = None
     Document = None
+    Language = None
     RecursiveCharacterTextSplitter = None
     OpenAIEmbeddings = None
     ChatOpenAI = None
     FAISS = None
+    _USE_RETRIEVAL_CHAIN = False
 
 from config.constants import (
     ENV_OPENAI_API_KEY,
     DEFAULT_GPT_MODEL,
-    DEFAULT_VECTORSTORE_PATH
+    DEFAULT_VECTORSTORE_PATH,
+    EMBEDDING_BATCH_SIZE,
+    EMBEDDING_TOKENS_PER_MINUTE,
+    EMBEDDING_CONCURRENCY,
+    DEFAULT_LLM_MAX_ATTEMPTS,
+    DEFAULT_FILE_IO_WORKERS
 )
+from utils.json_processor import loads_json, write_json_file
+
+EMBEDDING_MODEL = 'text-embedding-3-large'
+
+# Prompt for RAG case generation, dedented once at import
+RAG_PROMPT_TEMPLATE = textwrap.dedent("""
+    ### Instruction ###
+    You are a helpful Testing Assistant skilled in understanding related source code,
+    and generating fuzzing cases for software black-box testing according to the
+    fuzzing policies below.
+    It is imperative that your responses be strictly based on the text provided.
+
+    ### Fuzzing Policies ###
+    - Changing Argument Values:
+        -- if the valid argument value is in a range and will be check the datatype,
+           provide both extreme values(such as min and max of the valid range) and
+           random valid values.
+        -- if the valid argument value is a string-type, change the length trying to
+           trigger buffer overflows.
+        -- provide empty values to strings to trigger uninitialized read or null
+           pointer deference.
+        -- provide NULL or only one element to arrays, sets, or bags to cause null
+           pointer deference or out-of-bounds access
+    - Changing Argument Types:
+        -- if there is no datatype check in the source code of a function, change the
+           argument data type from t to a randomly selected one t', to check whether the
+           program can handle the special type.
+    - Changing the Number of Arguments:
+        -- For a function requiring n arguments, mutate the cases providing n+1, n−1,
+           or 0 arguments.
+
+    ### Chain of Thought ###
+    1. According to the API specification given in the question, list the functions
+       (both Static Methods and Methods);
+    2. For each API function, according to the specification, extract the related
+       source code in Lua;
+    3. For the source code of each API function, check the arguments and if there is
+       datatype checking, i.e. 'data_types.validate_or_build_type()' called;
+    4. For each API function, generate three fuzzing cases for exploring vulnerabilities
+       purpose.
+
+    ### Example of Fuzzing Test Cases ###
+    You may list every fuzzing(test) case starting with 'Test_Case' followed by the
+    number of the current test case. The "API_Name" should converted, i.e. from
+    "st.zigbee.zdo.BindRequest" to "zdo/mgmt_bind_request". Here is an example of
+    generated fuzzing case:
+    ```
+    [
+        {{
+            "Test_Case": 1,
+            "API_Name": "zdo/mgmt_bind_request",
+            "Function_Name": "from_values",
+            "Description": "Call from_values with appropriate values for start_index.",
+            "Code_Snippets": [
+                "MgmtBindRequest.from_values({{}}, 0)",
+                "MgmtBindRequest.from_values({{}}, 1)",
+                "MgmtBindRequest.from_values({{}}, 2)"
+            ]
+        }}
+    ]
+    ```
+
+    Note:
+    - Please avoiding mutating the parameter within a function, e.g.
+      ""Code_Snippets": ["deserialize(string.rep('A', 10^6))":", while you may note
+      the pre-operation needed to be executed in Python, e.g.
+      ""Pre-operation_Python": ["temp = 'A'*10^6"], "Code_Snippets": ["deserialize(temp)"]"
+    - Please generating the fuzzing cases with code_snippets for calling existing
+      functions mentioned in the provided specification. Note that the fuzzing environment
+      disabled load() and loadfile() functions, so avoiding mutating any self-defined
+      functions.
+
+    Use the following context of API source code in Lua to answer the question:
+    ```{context}```
+""").strip()
+
+
+async def aembed_texts_batched(
+    texts: List[str],
+    embedding_model: Any,
+    batch_size: int = EMBEDDING_BATCH_SIZE,
+    tokens_per_minute: int = EMBEDDING_TOKENS_PER_MINUTE,
+    max_concurrency: int = EMBEDDING_CONCURRENCY
+) -> List[List[float]]:
+    """
+    Embed texts in concurrent batches, one embeddings request per batch.
+    
+    At most max_concurrency requests are in flight, and requests are paced
+    so the approximate token count (4 characters per token) sent in any
+    minute stays within tokens_per_minute. Rate limit, connection and
+    server errors are retried with exponential backoff.
+    
+    Args:
+        texts: Texts to embed
+        embedding_model: LangChain embeddings instance
+        batch_size: Number of texts per request
+        tokens_per_minute: Approximate token budget per minute
+        max_concurrency: Maximum number of requests in flight
+        
+    Returns:
+        Embedding vectors in the same order as texts
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    budget_lock = asyncio.Lock()
+    window = {"start": time.monotonic(), "tokens": 0}
+    retryable = (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError)
+    
+    async def reserve_tokens(tokens: int) -> None:
+        async with budget_lock:
+            elapsed = time.monotonic() - window["start"]
+            if elapsed >= 60:
+                window["start"], window["tokens"] = time.monotonic(), 0
+            elif window["tokens"] and window["tokens"] + tokens > tokens_per_minute:
+                await asyncio.sleep(60 - elapsed)
+                window["start"], window["tokens"] = time.monotonic(), 0
+            window["tokens"] += tokens
+    
+    async def embed_batch(batch: List[str]) -> List[List[float]]:
+        async with semaphore:
+            await reserve_tokens(sum(len(text) for text in batch) // 4)
+            for attempt in range(DEFAULT_LLM_MAX_ATTEMPTS):
+                try:
+                    return await embedding_model.aembed_documents(batch)
+                except retryable as e:
+                    if attempt == DEFAULT_LLM_MAX_ATTEMPTS - 1:
+                        raise
+                    delay = min(60, 2 ** attempt) + random.random()
+                    print(f"Embedding request failed ({e}); retrying in {delay:.1f} seconds...")
+                    await asyncio.sleep(delay)
+    
+    batches = [texts[start:start + batch_size] for start in range(0, len(texts), batch_size)]
+    results = await asyncio.gather(*(embed_batch(batch) for batch in batches))
+    return [vector for batch_vectors in results for vector in batch_vectors]
+
+
+def quantize_index_fp16(vectorstore: Any) -> None:
+    """
+    Replace a vector store's FAISS index with an fp16 scalar-quantized copy.
+    
+    Halves the memory and on-disk size of the default fp32 flat index
+    while keeping exact (non-approximate) search. Vector ids, and so the
+    docstore mapping, are unchanged.
+    
+    Args:
+        vectorstore: LangChain FAISS vector store
+    """
+    index = vectorstore.index
+    if index.ntotal == 0:
+        return
+    
+    vectors = index.reconstruct_n(0, index.ntotal)
+    quantized = faiss.IndexScalarQuantizer(index.d, faiss.ScalarQuantizer.QT_fp16, index.metric_type)
+    quantized.train(vectors)
+    quantized.add(vectors)
+    vectorstore.index = quantized
+
+
+def mmap_index(vectorstore: Any, vectorstore_path: str) -> None:
+    """
+    Re-open a saved IVF vector store index memory-mapped, read-only.
+    
+    FAISS only memory-maps the inverted lists of IVF indexes; other index
+    types (including the fp16 scalar-quantized index built by
+    setup_rag_pipeline) ignore IO_FLAG_MMAP and would just be read into
+    memory a second time, so they keep the copy loaded by FAISS.load_local.
+    
+    Args:
+        vectorstore: LangChain FAISS vector store loaded from vectorstore_path
+        vectorstore_path: Directory the vector store was loaded from
+    """
+    try:
+        faiss.extract_index_ivf(vectorstore.index)
+    except RuntimeError:
+        # Not an IVF index, so there is nothing to map
+        return
+    
+    index_file = os.path.join(vectorstore_path, "index.faiss")
+    vectorstore.index = faiss.read_index(index_file, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+
+
+def scan_files(base_folder: str, file_extension: str) -> List[str]:
+    """
+    Recursively list files under a folder that end with an extension.
+    
+    Uses an explicit stack of os.scandir calls, so file names are filtered
+    without an extra stat per entry.
+    
+    Args:
+        base_folder: Folder to search
+        file_extension: File name suffix to match, e.g. ".lua"
+        
+    Returns:
+        Paths of matching files
+    """
+    file_paths = []
+    stack = [base_folder]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.name.endswith(file_extension):
+                    file_paths.append(entry.path)
+    return file_paths
+
+
+def _read_text_file(file_path: str) -> str:
+    """
+    Read a UTF-8 text file.
+    
+    Reads the bytes and decodes them once, skipping the per-file text
+    wrapper; line endings are kept as they are on disk.
+    
+    Args:
+        file_path: Path to file
+        
+    Returns:
+        File content
+    """
+    return Path(file_path).read_bytes().decode("utf-8")
+
+
+@lru_cache(maxsize=1)
+def get_rag_prompt_template() -> Any:
+    """
+    Get the RAG prompt template, creating it on first use.
+    
+    Returns:
+        PromptTemplate over RAG_PROMPT_TEMPLATE
+    """
+    return PromptTemplate(input_variables=["context"], template=RAG_PROMPT_TEMPLATE)
+
+
+@lru_cache(maxsize=8)
+def get_chat_llm(model_name: str, temperature: float) -> Any:
+    """
+    Get a chat model client, shared per (model_name, temperature).
+    
+    Args:
+        model_name: LLM model name
+        temperature: Temperature parameter
+        
+    Returns:
+        ChatOpenAI instance
+    """
+    return ChatOpenAI(model=model_name, temperature=temperature)
 
 
 def setup_rag_pipeline(
@@ -65,40 +331,38 @@ def setup_rag_pipeline(
     if os.path.exists(vectorstore_path):
         vectorstore = FAISS.load_local(
             vectorstore_path,
-            OpenAIEmbeddings(model='text-embedding-3-large'),
+            OpenAIEmbeddings(model=EMBEDDING_MODEL),
             allow_dangerous_deserialization=True
         )
+        mmap_index(vectorstore, vectorstore_path)
     else:
         # Create vector store from Lua files
         def load_documents_with_metadata(base_folder: str, file_extension: str, is_lua: bool = False):
-            documents = []
-            for root, _, files in os.walk(base_folder):
-                for file_name in files:
-                    if file_name.endswith(file_extension):
-                        file_path = os.path.join(root, file_name)
-                        relative_path = os.path.relpath(file_path, base_folder)
-                        metadata = {"source": relative_path}
-                        
-                        if is_lua:
-                            with open(file_path, "r", encoding="utf-8") as f:
-                                content = f.read()
-                            documents.append(Document(page_content=content, metadata=metadata))
-                        else:
-                            from langchain_community.document_loaders import UnstructuredFileLoader
-                            loader = UnstructuredFileLoader(file_path, metadata=metadata)
-                            documents.extend(loader.load())
+            file_paths = scan_files(base_folder, file_extension)
+            metadatas = [{"source": os.path.relpath(path, base_folder)} for path in file_paths]
             
             if is_lua:
-                lua_separators = [
-                    "\nand", "\nbreak", "\ndo", "\nelse", "\nelseif", "\nend", "\nfalse", "\nfor", "\nfunction",
-                    "\ngoto", "\nif", "\nin", "\nlocal", "\nnil", "\nnot", "\nor", "\nrepeat", "\nreturn", "\nthen",
-                    "\ntrue", "\nuntil", "\nwhile", '\n\n', '\n'
+                # Overlap the file reads
+                with ThreadPoolExecutor(max_workers=DEFAULT_FILE_IO_WORKERS) as executor:
+                    contents = list(executor.map(_read_text_file, file_paths))
+                documents = [
+                    Document(page_content=content, metadata=metadata)
+                    for content, metadata in zip(contents, metadatas)
                 ]
-                lua_splitter = RecursiveCharacterTextSplitter(
+            else:
+                from langchain_community.document_loaders import UnstructuredFileLoader
+                documents = []
+                for file_path, metadata in zip(file_paths, metadatas):
+                    loader = UnstructuredFileLoader(file_path, metadata=metadata)
+                    documents.extend(loader.load())
+            
+            if is_lua:
+                # LangChain's Lua separators split on local/function/control-flow
+                # boundaries and end with "" so oversized chunks still split
+                lua_splitter = RecursiveCharacterTextSplitter.from_language(
+                    language=Language.LUA,
                     chunk_size=2048,
                     chunk_overlap=256,
-                    length_function=len,
-                    separators=lua_separators,
                 )
                 split_docs = lua_splitter.split_documents(documents)
             else:
@@ -107,97 +371,78 @@ def setup_rag_pipeline(
             return split_docs
         
         lua_docs = load_documents_with_metadata(lua_folder, ".lua", is_lua=True)
-        embedding_model = OpenAIEmbeddings(model='text-embedding-3-large')
-        vectorstore = FAISS.from_documents(lua_docs, embedding_model)
+        embedding_model = OpenAIEmbeddings(model=EMBEDDING_MODEL, chunk_size=EMBEDDING_BATCH_SIZE)
+        texts = [doc.page_content for doc in lua_docs]
+        vectors = asyncio.run(aembed_texts_batched(texts, embedding_model))
+        vectorstore = FAISS.from_embeddings(
+            list(zip(texts, vectors)),
+            embedding_model,
+            metadatas=[doc.metadata for doc in lua_docs]
+        )
+        quantize_index_fp16(vectorstore)
         vectorstore.save_local(vectorstore_path)
     
-    # Create prompt template
-    prompt_template = PromptTemplate(
-        input_variables=["context"],
-        template=(
-            """
-            ### Instruction ###
-            You are a helpful Testing Assistant skilled in understanding related source code, 
-            and generating fuzzing cases for software black-box testing according to the 
-            fuzzing policies below.
-            It is imperative that your responses be strictly based on the text provided. 
-            
-            ### Fuzzing Policies ###
-            - Changing Argument Values:  
-                -- if the valid argument value is in a range and will be check the datatype, 
-                   provide both extreme values(such as min and max of the valid range) and 
-                   random valid values. 
-                -- if the valid argument value is a string-type, change the length trying to 
-                   trigger buffer overflows. 
-                -- provide empty values to strings to trigger uninitialized read or null 
-                   pointer deference. 
-                -- provide NULL or only one element to arrays, sets, or bags to cause null 
-                   pointer deference or out-of-bounds access 
-            - Changing Argument Types:  
-                -- if there is no datatype check in the source code of a function, change the 
-                   argument data type from t to a randomly selected one t', to check whether the 
-                   program can handle the special type. 
-            - Changing the Number of Arguments:  
-                -- For a function requiring n arguments, mutate the cases providing n+1, n−1, 
-                   or 0 arguments. 
-            
-            ### Chain of Thought ###
-            1. According to the API specification given in the question, list the functions
-               (both Static Methods and Methods);
-            2. For each API function, according to the specification, extract the related 
-               source code in Lua;
-            3. For the source code of each API function, check the arguments and if there is 
-               datatype checking, i.e. 'data_types.validate_or_build_type()' called;
-            4. For each API function, generate three fuzzing cases for exploring vulnerabilities 
-               purpose.
-            
-            ### Example of Fuzzing Test Cases ###
-            You may list every fuzzing(test) case starting with 'Test_Case' followed by the 
-            number of the current test case. The "API_Name" should converted, i.e. from 
-            "st.zigbee.zdo.BindRequest" to "zdo/mgmt_bind_request". Here is an example of 
-            generated fuzzing case:
-            ```
-            [
-                {{
-                    "Test_Case": 1,
-                    "API_Name": "zdo/mgmt_bind_request",
-                    "Function_Name": "from_values",
-                    "Description": "Call from_values with appropriate values for start_index.",
-                    "Code_Snippets": [
-                        "MgmtBindRequest.from_values({{}}, 0)", 
-                        "MgmtBindRequest.from_values({{}}, 1)",
-                        "MgmtBindRequest.from_values({{}}, 2)"
-                    ]
-                }}
-            ]
-            ```
-            
-            Note:
-            - Please avoiding mutating the parameter within a function, e.g. 
-              ""Code_Snippets": ["deserialize(string.rep('A', 10^6))":", while you may note 
-              the pre-operation needed to be executed in Python, e.g. 
-              ""Pre-operation_Python": ["temp = 'A'*10^6"], "Code_Snippets": ["deserialize(temp)"]"
-            - Please generating the fuzzing cases with code_snippets for calling existing 
-              functions mentioned in the provided specification. Note that the fuzzing environment 
-              disabled load() and loadfile() functions, so avoiding mutating any self-defined 
-              functions.
-            
-            Use the following context of API source code in Lua to answer the question:
-            ```{context}```
-            """
-        )
-    )
+    return [vectorstore.as_retriever(), get_rag_prompt_template(), get_chat_llm(model_name, temperature)]
+
+
+@lru_cache(maxsize=8)
+def get_rag_pipeline(
+    lua_folder: str,
+    vectorstore_path: str = DEFAULT_VECTORSTORE_PATH,
+    model_name: str = DEFAULT_GPT_MODEL,
+    temperature: float = 0
+) -> list:
+    """
+    Get a RAG pipeline, setting it up once per process for each argument set.
+    
+    Use this instead of setup_rag_pipeline when generating cases across
+    rounds, so the vector store is loaded or built only once. The returned
+    list is shared between callers.
+    
+    Args:
+        lua_folder: Path to folder containing Lua source code files
+        vectorstore_path: Path to save/load FAISS vector store
+        model_name: LLM model name for generation
+        temperature: Temperature parameter for LLM
+        
+    Returns:
+        List containing [retriever, prompt_template, llm]
+    """
+    return setup_rag_pipeline(lua_folder, vectorstore_path, model_name, temperature)
+
+
+def _build_retrieval_chain(retriever: Any, prompt_template: Any, llm: Any) -> Any:
+    """
+    Build the retrieval QA chain for the installed langchain version.
     
-    # Create LLM
-    llm = ChatOpenAI(model=model_name, temperature=temperature)
+    Args:
+        retriever: Vector store retriever
+        prompt_template: Prompt template for the answer step
+        llm: Chat model
+        
+    Returns:
+        Runnable retrieval chain
+    """
+    if _USE_RETRIEVAL_CHAIN:
+        question_answer_chain = create_stuff_documents_chain(llm, prompt_template)
+        return create_retrieval_chain(retriever, question_answer_chain)
     
-    return [vectorstore.as_retriever(), prompt_template, llm]
+    from langchain.chains import RetrievalQA
+    return RetrievalQA.from_chain_type(
+        llm=llm,
+        retriever=retriever,
+        chain_type="stuff",
+        chain_type_kwargs={"prompt": prompt_template},
+    )
 
 
 def generate_response(pipeline: list, query: str) -> Dict[str, Any]:
     """
     Generate a response using the RAG pipeline.
     
+    The retrieval chain is built on the first call and appended to the
+    pipeline list, so later queries reuse it.
+    
     Args:
         pipeline: RAG pipeline list [retriever, prompt_template, llm]
         query: Query/question to answer
@@ -205,23 +450,13 @@ def generate_response(pipeline: list, query: str) -> Dict[str, Any]:
     Returns:
         Response dictionary with answer and context
     """
-    retriever = pipeline[0]
-    prompt_template = pipeline[1]
-    llm = pipeline[2]
+    if len(pipeline) < 4:
+        pipeline.append(_build_retrieval_chain(pipeline[0], pipeline[1], pipeline[2]))
+    retrieval_chain = pipeline[3]
     
-    if langchain.__version__ > '0.3':
-        question_answer_chain = create_stuff_documents_chain(llm, prompt_template)
-        retrieval_chain = create_retrieval_chain(retriever, question_answer_chain)
+    if _USE_RETRIEVAL_CHAIN:
         return retrieval_chain.invoke({'input': query})
-    else:
-        from langchain.chains import RetrievalQA
-        retrieval_chain = RetrievalQA.from_chain_type(
-            llm=llm,
-            retriever=retriever,
-            chain_type="stuff",
-            chain_type_kwargs={"prompt": prompt_template},
-        )
-        return retrieval_chain.invoke({'query': query})
+    return retrieval_chain.invoke({'query': query})
 
 
 def extract_and_save_answer(
@@ -245,16 +480,19 @@ def extract_and_save_answer(
     
     raw_answer = data.get("answer", "")
     
-    # Clean and parse JSON
-    cleaned_answer = re.sub(r"```json\n|\n```", "", raw_answer).strip()
+    # Strip the surrounding ```json fence, then parse
+    cleaned_answer = raw_answer.strip()
+    if cleaned_answer.startswith("```json"):
+        cleaned_answer = cleaned_answer[len("```json"):]
+    if cleaned_answer.endswith("```"):
+        cleaned_answer = cleaned_answer[:-len("```")]
     
     try:
-        answer_json = json.loads(cleaned_answer)
+        answer_json = loads_json(cleaned_answer.strip())
     except json.JSONDecodeError as e:
         raise ValueError(f"Failed to parse 'answer' as JSON: {e}")
     
-    with open(output_filename, "w", encoding="utf-8") as outfile:
-        json.dump(answer_json, outfile, indent=4)
+    write_json_file(answer_json, output_filename)
     
     print(f"Extracted 'answer' saved to: {output_filename}")
 
@@ -15,7 +15,8 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from core.fuzzer import (
     random_fuzzing,
     case_fuzzing,
-    create_argument_parser
+    create_argument_parser,
+    configure_logging
 )
 from config.constants import (
     DEFAULT_HUB_IP,
@@ -38,6 +39,7 @@ def main():
     """
     parser = create_argument_parser()
     args = parser.parse_args()
+    configure_logging(args.log_level)
     
     # Execute fuzzing based on mode
     if args.case_fuzzing:
@@ -30,7 +30,7 @@ def extract_code_snippets(
 
     # Iterate through each API in fuzzing_api_choices
     for api_name in FUZZING_API_CHOICES:
-        funcs = FUNC_SUM.get(api_name, [])
+        funcs = FUNC_SUM.get(api_name, ())
 
         # Ensure the API-specific output directory exists
         api_output_folder = os.path.join(output_base_folder, api_name)
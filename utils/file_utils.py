@@ -6,8 +6,70 @@ fuzzing framework, including JSON, HTML, YAML, and JSONL file handling.
 """
 
 import os
-import json
+import logging
+from functools import lru_cache
+from typing import Any, Set, Union
 from utils.logger import FileLogger
+from utils.json_processor import dumps_json_bytes, write_json_file
+
+ERROR_LOG_FORMAT = '%(asctime)s - %(pathname)s[line:%(lineno)d] - %(levelname)s: %(message)s'
+
+# Directories already created by this process
+_KNOWN_DIRS: Set[str] = set()
+
+
+@lru_cache(maxsize=None)
+def _get_file_logger(filename: str, level: str = 'info', fmt: str = '%(message)s') -> logging.Logger:
+    """
+    Get a file logger, creating its FileLogger only on first use.
+    
+    FileLogger opens a new file handler every time it is constructed, so
+    loggers are cached per (filename, level, fmt).
+    
+    Args:
+        filename: Log file path
+        level: Logging level (debug, info, warning, error, crit)
+        fmt: Log message format
+        
+    Returns:
+        Configured logging.Logger
+    """
+    return FileLogger(filename, level=level, fmt=fmt).logger
+
+
+def _log_error(msg: Exception) -> None:
+    """
+    Record a write failure in error.log.
+    
+    Args:
+        msg: Exception raised by the failed write
+    """
+    _get_file_logger('error.log', level='error', fmt=ERROR_LOG_FORMAT).error(msg)
+
+
+def _ensure_parent_dir(file_path: str) -> None:
+    """
+    Create the parent directory of a file once per process.
+    
+    Args:
+        file_path: File whose directory must exist
+    """
+    directory = os.path.dirname(file_path)
+    if directory and directory not in _KNOWN_DIRS:
+        os.makedirs(directory, exist_ok=True)
+        _KNOWN_DIRS.add(directory)
+
+
+def _append_line(file_path: str, text: str) -> None:
+    """
+    Append one line of text to a file.
+    
+    Args:
+        file_path: File to append to
+        text: Line content, without the trailing newline
+    """
+    with open(file_path, 'a', encoding='utf-8') as f:
+        f.write(f'{text}\n')
 
 
 def write_in_path(json_data: str, path: str) -> None:
@@ -22,12 +84,10 @@ def write_in_path(json_data: str, path: str) -> None:
         path: File path (without extension)
     """
     try:
-        os.makedirs(os.path.dirname(f'{path}.json'), exist_ok=True)
-        FileLogger(f'{path}.json', level='info').logger.info(str(json_data))
+        _ensure_parent_dir(f'{path}.json')
+        _append_line(f'{path}.json', str(json_data))
     except Exception as msg:
-        FileLogger('error.log', level='error', 
-                  fmt='%(asctime)s - %(pathname)s[line:%(lineno)d] - %(levelname)s: %(message)s'
-                  ).logger.error(msg)
+        _log_error(msg)
 
 
 def write_in_json(json_data: dict, path: str) -> None:
@@ -39,13 +99,10 @@ def write_in_json(json_data: dict, path: str) -> None:
         path: File path (without extension)
     """
     try:
-        os.makedirs(os.path.dirname(f'{path}.json'), exist_ok=True)
-        with open(f'{path}.json', 'w', encoding='utf-8') as f:
-            json.dump(json_data, f, indent=4)
+        _ensure_parent_dir(f'{path}.json')
+        write_json_file(json_data, f'{path}.json')
     except Exception as msg:
-        FileLogger('error.log', level='error',
-                  fmt='%(asctime)s - %(pathname)s[line:%(lineno)d] - %(levelname)s: %(message)s'
-                  ).logger.error(msg)
+        _log_error(msg)
 
 
 def write_in_html(html_data: str, path: str) -> None:
@@ -57,11 +114,9 @@ def write_in_html(html_data: str, path: str) -> None:
         path: File path (without extension)
     """
     try:
-        FileLogger(f'{path}.html', level='info').logger.info(str(html_data))
+        _append_line(f'{path}.html', str(html_data))
     except Exception as msg:
-        FileLogger('error.log', level='error',
-                  fmt='%(asctime)s - %(pathname)s[line:%(lineno)d] - %(levelname)s: %(message)s'
-                  ).logger.error(msg)
+        _log_error(msg)
 
 
 def write_in_yml(yml_data: str, path: str) -> None:
@@ -76,20 +131,29 @@ def write_in_yml(yml_data: str, path: str) -> None:
         f.write(yml_data)
 
 
-def write_in_jsonl(json_data: str, path: str) -> None:
+def write_in_jsonl(json_data: Union[str, bytes, Any], path: str) -> None:
     """
     Write JSON data to a JSONL file (one JSON object per line).
     
+    Strings and bytes are written as already-serialized JSON; any other
+    object is serialized first.
+    
     Args:
-        json_data: JSON string to write
+        json_data: JSON string or bytes, or an object to serialize
         path: File path (without extension)
     """
     try:
-        FileLogger(f'{path}.jsonl', level='info').logger.info(str(json_data))
+        if isinstance(json_data, str):
+            line = json_data.encode('utf-8')
+        elif isinstance(json_data, bytes):
+            line = json_data
+        else:
+            line = dumps_json_bytes(json_data)
+        _ensure_parent_dir(f'{path}.jsonl')
+        with open(f'{path}.jsonl', 'ab') as f:
+            f.write(line + b'\n')
     except Exception as msg:
-        FileLogger('error.log', level='error',
-                  fmt='%(asctime)s - %(pathname)s[line:%(lineno)d] - %(levelname)s: %(message)s'
-                  ).logger.error(msg)
+        _log_error(msg)
 
 
 def check_dir(mypath: str) -> None:
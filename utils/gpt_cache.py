@@ -0,0 +1,93 @@
+"""
+GPT Cache Module
+
+This module provides an on-disk cache of GPT responses keyed by model and
+prompt, so repeated runs with identical prompts skip the API call.
+"""
+
+import hashlib
+import os
+import tempfile
+from typing import Optional
+
+from config.constants import DEFAULT_GPT_CACHE_PATH, ENV_GPT_CACHE
+
+
+def is_enabled() -> bool:
+    """
+    Check whether GPT response caching is enabled.
+    
+    Returns:
+        True if the EDGEFUZZ_GPT_CACHE environment variable is set to "1"
+    """
+    return os.environ.get(ENV_GPT_CACHE) == "1"
+
+
+def make_key(model: str, prompt: str) -> str:
+    """
+    Build the cache key for a model and prompt.
+    
+    Args:
+        model: Model name
+        prompt: Prompt text
+        
+    Returns:
+        SHA-256 hex digest of the model and prompt
+    """
+    return hashlib.sha256(f"{model}\x00{prompt}".encode("utf-8")).hexdigest()
+
+
+def _key_path(key: str, cache_dir: str) -> str:
+    """
+    Get the file path for a cache key, sharded by its first two characters.
+    
+    Args:
+        key: Cache key
+        cache_dir: Cache root directory
+        
+    Returns:
+        Path of the cache file
+    """
+    return os.path.join(cache_dir, key[:2], f"{key}.txt")
+
+
+def get(key: str, cache_dir: str = DEFAULT_GPT_CACHE_PATH) -> Optional[str]:
+    """
+    Read a cached response.
+    
+    Args:
+        key: Cache key from make_key
+        cache_dir: Cache root directory
+        
+    Returns:
+        Cached response, or None on a cache miss
+    """
+    try:
+        with open(_key_path(key, cache_dir), encoding="utf-8") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def put(key: str, value: str, cache_dir: str = DEFAULT_GPT_CACHE_PATH) -> None:
+    """
+    Store a response in the cache.
+    
+    The response is written to a temporary file and moved into place with
+    os.replace, so concurrent readers never see a partial entry.
+    
+    Args:
+        key: Cache key from make_key
+        value: Response to store
+        cache_dir: Cache root directory
+    """
+    path = _key_path(key, cache_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(value)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
@@ -7,8 +7,126 @@ content from LLM responses, and handling batch API responses.
 
 import os
 import json
+import logging
 import re
-from typing import Dict, Any, List, Optional
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Set, Tuple, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from config.constants import DEFAULT_FILE_IO_WORKERS
+
+logger = logging.getLogger(__name__)
+
+# JavaScript-style line comments in model-generated JSON
+_JS_COMMENT_RE = re.compile(r'//.*')
+
+# Fenced ```json ... ``` block in a stored LLM answer
+_JSON_FENCE_RE = re.compile(r"```json\n(.*?)\n```", re.DOTALL)
+
+# Fenced ```json ... ``` block in a batch response, whitespace-tolerant
+_JSON_BLOCK_RE = re.compile(r'```json\s*(.*?)\s*```', re.DOTALL)
+
+# Batch custom_id such as "url-0parse_path": API, round number, function
+_CUSTOM_ID_RE = re.compile(r'([^-]+)-(\d+)(.+)')
+
+
+def loads_json(data: Union[str, bytes]) -> Any:
+    """
+    Parse a JSON document, using orjson when it is installed.
+    
+    orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers can
+    keep catching the standard library exception.
+    
+    Args:
+        data: JSON document as str or bytes
+        
+    Returns:
+        Parsed Python object
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps_json(obj: Any) -> str:
+    """
+    Serialize an object to a compact JSON string, using orjson when installed.
+    
+    Non-ASCII characters are emitted as UTF-8 rather than \\u escapes, so
+    byte lengths must be computed on the encoded string.
+    
+    Args:
+        obj: Object to serialize
+        
+    Returns:
+        JSON string
+    """
+    if orjson is not None:
+        return orjson.dumps(obj).decode('utf-8')
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'))
+
+
+def dumps_json_bytes(obj: Any) -> bytes:
+    """
+    Serialize an object to compact UTF-8 encoded JSON.
+    
+    Use this instead of dumps_json() when the result is written to a socket
+    or binary file, so orjson output is not decoded only to be re-encoded.
+    
+    Args:
+        obj: Object to serialize
+        
+    Returns:
+        UTF-8 encoded JSON
+    """
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def dumps_json_indented_bytes(obj: Any) -> bytes:
+    """
+    Serialize an object to indented UTF-8 encoded JSON for human-readable files.
+    
+    orjson only supports two-space indentation, so the standard library
+    fallback uses the same width to keep output identical either way.
+    
+    Args:
+        obj: Object to serialize
+        
+    Returns:
+        UTF-8 encoded, two-space indented JSON
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, ensure_ascii=False, indent=2).encode('utf-8')
+
+
+def write_json_file(obj: Any, file_path: str) -> None:
+    """
+    Atomically write an object as indented JSON.
+    
+    The JSON is written to a temporary file in the destination directory
+    and moved into place with os.replace, so a crash mid-write never
+    leaves a partial file for later stages to parse.
+    
+    Args:
+        obj: Object to serialize
+        file_path: Destination file path (its directory must exist)
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(file_path) or ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(dumps_json_indented_bytes(obj))
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
 
 
 def extract_and_save_answer(input_json_file: str) -> None:
@@ -18,18 +136,17 @@ def extract_and_save_answer(input_json_file: str) -> None:
     Args:
         input_json_file: Path to input JSON file
     """
-    with open(input_json_file, 'r', encoding='utf-8') as file:
-        data = json.load(file)
+    with open(input_json_file, 'rb') as file:
+        data = loads_json(file.read())
 
     output_filename = input_json_file
     os.makedirs(os.path.dirname(output_filename), exist_ok=True)
 
     raw_answer = data.get("content", "")
 
-    with open(output_filename, "w", encoding="utf-8") as outfile:
-        json.dump(raw_answer, outfile, indent=4)
+    write_json_file(raw_answer, output_filename)
 
-    print(f"Extracted 'content' saved to: {output_filename}")
+    logger.debug("Extracted 'content' saved to: %s", output_filename)
 
 
 def clean_json_string(json_str: str) -> str:
@@ -42,7 +159,7 @@ def clean_json_string(json_str: str) -> str:
     Returns:
         Cleaned JSON string
     """
-    json_str = re.sub(r'//.*', '--.*', json_str)
+    json_str = _JS_COMMENT_RE.sub('--.*', json_str)
     return json_str
 
 
@@ -60,79 +177,126 @@ def extract_and_save_json(input_json_file: str, output_json_file: str) -> bool:
     Returns:
         True if successful, False otherwise
     """
-    with open(input_json_file, 'r', encoding='utf-8') as file:
-        input_data = json.load(file)
+    with open(input_json_file, 'rb') as file:
+        input_data = loads_json(file.read())
 
     if isinstance(input_data, list):
         for idx, data in enumerate(input_data):
             content = data.get("content", "")
             # Skip if content is already processed (not a string)
             if not isinstance(content, str):
-                print(f"Content at index {idx} is already processed (not a string)")
+                logger.debug("Content at index %d is already processed (not a string)", idx)
                 continue
                 
             if content:
-                match = re.search(r"```json\n(.*?)\n```", content, re.DOTALL)
+                match = _JSON_FENCE_RE.search(content)
                 
                 if match:
                     extracted_json = match.group(1)
                     extracted_json = clean_json_string(extracted_json)
                     try:
-                        parsed_json = json.loads(extracted_json)
+                        parsed_json = loads_json(extracted_json)
                         input_data[idx]["content"] = parsed_json
                     except json.JSONDecodeError as e:
-                        print(f"Error decoding JSON in file {input_json_file}, index {idx}: {e}")
+                        logger.warning("Error decoding JSON in file %s, index %d: %s", input_json_file, idx, e)
                 else:
-                    print(f"No valid JSON content found in the 'content' field of "
-                          f"{input_json_file}, index {idx}")
+                    logger.warning("No valid JSON content found in the 'content' field of %s, index %d",
+                                   input_json_file, idx)
     
     elif isinstance(input_data, dict):
         content = input_data.get("content", "")
         # Skip if content is already processed (not a string)
         if not isinstance(content, str):
-            print(f"Content is already processed (not a string)")
+            logger.debug("Content is already processed (not a string)")
         elif content:
-            match = re.search(r"```json\n(.*?)\n```", content, re.DOTALL)
+            match = _JSON_FENCE_RE.search(content)
             if match:
                 extracted_json = match.group(1)
                 try:
-                    parsed_json = json.loads(extracted_json)
+                    parsed_json = loads_json(extracted_json)
                     input_data["content"] = parsed_json
                 except json.JSONDecodeError as e:
-                    print(f"Error decoding JSON in file {input_json_file}: {e}")
+                    logger.warning("Error decoding JSON in file %s: %s", input_json_file, e)
             else:
-                print(f"No valid JSON content found in the 'content' field of {input_json_file}")
+                logger.warning("No valid JSON content found in the 'content' field of %s", input_json_file)
 
-    with open(output_json_file, "w", encoding="utf-8") as outfile:
-        json.dump(input_data, outfile, indent=4)
+    write_json_file(input_data, output_json_file)
 
     print(f"JSON content has been saved to {output_json_file}")
     return True
 
 
+def _try_extract_and_save_answer(file_path: str) -> bool:
+    """
+    Run extract_and_save_answer on one file, reporting rather than raising errors.
+    
+    Args:
+        file_path: Path to JSON file
+        
+    Returns:
+        True if the file was processed, False otherwise
+    """
+    try:
+        extract_and_save_answer(file_path)
+        return True
+    except Exception as e:
+        logger.warning("Error processing %s: %s", os.path.basename(file_path), e)
+        return False
+
+
 def process_all_files_in_folder(folder_path: str) -> None:
     """
     Process all JSON files in a folder, extracting content.
     
+    Files are independent, so they are processed concurrently.
+    
     Args:
         folder_path: Path to folder containing JSON files
     """
-    processed_count = 0
-    skipped_count = 0
+    with os.scandir(folder_path) as entries:
+        file_paths = [entry.path for entry in entries if entry.name.endswith(".json")]
     
-    for filename in os.listdir(folder_path):
-        if filename.endswith(".json"):
-            try:
-                extract_and_save_answer(os.path.join(folder_path, filename))
-                processed_count += 1
-            except Exception as e:
-                print(f"Error processing {filename}: {str(e)}")
-                skipped_count += 1
+    with ThreadPoolExecutor(max_workers=DEFAULT_FILE_IO_WORKERS) as executor:
+        results = list(executor.map(_try_extract_and_save_answer, file_paths))
+    
+    processed_count = sum(results)
+    skipped_count = len(results) - processed_count
     
     print(f"\nProcessing complete. Files processed: {processed_count}, "
           f"Files skipped: {skipped_count}")
 
 
+def _split_custom_id(custom_id: str) -> Optional[Tuple[str, str, str]]:
+    """
+    Split a batch custom_id into API, round number and function parts.
+    
+    Equivalent to matching _CUSTOM_ID_RE, using string operations on the
+    common path (e.g., "url-0parse_path" -> ("url", "0", "parse_path")).
+    
+    Args:
+        custom_id: Batch request custom_id
+        
+    Returns:
+        Tuple of (api, round_num, func_name), or None if the format is invalid
+    """
+    if "\n" in custom_id:
+        match = _CUSTOM_ID_RE.match(custom_id)
+        return match.groups() if match else None
+    
+    api, dash, rest = custom_id.partition("-")
+    if not api or not dash:
+        return None
+    
+    # The round number is the leading digits, leaving at least one
+    # character for the function name
+    digits = 0
+    while digits < len(rest) - 1 and rest[digits].isdecimal():
+        digits += 1
+    if digits == 0:
+        return None
+    return api, rest[:digits], rest[digits:]
+
+
 def extract_code_snippets_from_batch(
     jsonl_file: str,
     output_dir: str = "extracted_snippets"
@@ -147,29 +311,28 @@ def extract_code_snippets_from_batch(
         jsonl_file: Path to the JSONL file containing batch responses
         output_dir: Directory to save the extracted snippets
     """
-    # Track seen snippets to avoid duplicates
-    seen_snippets: Dict[str, set] = {}
+    # Track seen (output file, snippet) pairs to avoid duplicates; new
+    # snippets are grouped per output file and appended once after the
+    # whole file is parsed
+    seen_snippets: Set[Tuple[str, str]] = set()
+    new_snippets: Dict[str, List[str]] = {}
     
     with open(jsonl_file, 'r', encoding='utf-8') as f:
         for line in f:
             try:
                 # Parse the JSON line
-                entry = json.loads(line)
+                entry = loads_json(line)
                 
                 # Extract custom_id to use as filename
                 custom_id = entry.get('custom_id', 'unknown')
                 
                 # Split custom_id into parts (e.g., "url-0parse_path" -> ["url", "0", "parse_path"])
-                parts = re.match(r'([^-]+)-(\d+)(.+)', custom_id)
+                parts = _split_custom_id(custom_id)
                 if not parts:
-                    print(f"Invalid custom_id format: {custom_id}")
+                    logger.warning("Invalid custom_id format: %s", custom_id)
                     continue
                     
-                api, round_num, func_name = parts.groups()
-                
-                # Create nested directory structure
-                api_dir = os.path.join(output_dir, api)
-                os.makedirs(api_dir, exist_ok=True)
+                api, round_num, func_name = parts
                 
                 # Get the message content
                 message_content = (
@@ -180,45 +343,49 @@ def extract_code_snippets_from_batch(
                 )
                 
                 # Extract JSON content from the message
-                json_match = re.search(r'```json\s*(.*?)\s*```', message_content, re.DOTALL)
+                json_match = _JSON_BLOCK_RE.search(message_content)
                 if json_match:
                     json_content = json_match.group(1)
                     try:
                         # Parse the JSON content
-                        snippets_data = json.loads(json_content)
+                        snippets_data = loads_json(json_content)
                         
                         # Create output file path - use function name without the round number
-                        output_file = os.path.join(api_dir, f"{func_name[1:]}.lua")
+                        output_file = os.path.join(output_dir, api, f"{func_name[1:]}.lua")
+                        pending = new_snippets.setdefault(output_file, [])
                         
-                        # Initialize set for this file if not seen before
-                        if output_file not in seen_snippets:
-                            seen_snippets[output_file] = set()
-                        
-                        # Extract and write code snippets
-                        new_snippets = []
+                        # Collect code snippets we haven't seen before
                         for item in snippets_data:
                             if "Code_Snippets" in item:
                                 for snippet in item["Code_Snippets"]:
-                                    # Only add snippet if we haven't seen it before
-                                    if snippet not in seen_snippets[output_file]:
-                                        new_snippets.append(snippet)
-                                        seen_snippets[output_file].add(snippet)
-                        
-                        # Append new snippets to file
-                        if new_snippets:
-                            with open(output_file, 'a', encoding='utf-8') as out_f:
-                                for snippet in new_snippets:
-                                    out_f.write(f"{snippet}\n")
-                            
-                            print(f"Added {len(new_snippets)} snippets to {output_file}")
+                                    key = (output_file, snippet)
+                                    if key not in seen_snippets:
+                                        seen_snippets.add(key)
+                                        pending.append(snippet)
                         
                     except json.JSONDecodeError as e:
-                        print(f"Error parsing JSON content for {custom_id}: {e}")
+                        logger.warning("Error parsing JSON content for %s: %s", custom_id, e)
                 else:
-                    print(f"No JSON content found for {custom_id}")
+                    logger.warning("No JSON content found for %s", custom_id)
             
             except json.JSONDecodeError as e:
-                print(f"Error parsing JSONL line: {e}")
+                logger.warning("Error parsing JSONL line: %s", e)
             except Exception as e:
-                print(f"Error processing entry: {e}")
+                logger.warning("Error processing entry: %s", e)
+    
+    # Append new snippets with one open and write per output file
+    added_count = 0
+    file_count = 0
+    for output_file, snippets in new_snippets.items():
+        if not snippets:
+            continue
+        os.makedirs(os.path.dirname(output_file), exist_ok=True)
+        with open(output_file, 'a', encoding='utf-8', buffering=1 << 20) as out_f:
+            # Snippets come from model JSON and may not all be strings
+            out_f.write("\n".join(map(str, snippets)) + "\n")
+        logger.debug("Added %d snippets to %s", len(snippets), output_file)
+        added_count += len(snippets)
+        file_count += 1
+    
+    print(f"Added {added_count} snippets to {file_count} files in {output_dir}")
 
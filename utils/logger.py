@@ -11,8 +11,12 @@ import time
 import os
 import sys
 import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
 from typing import Optional, List
 
+from config.constants import LOG_BUFFER_SIZE, LOG_FLUSH_INTERVAL
+
 
 class CommandLogger:
     """
@@ -20,6 +24,9 @@ class CommandLogger:
     
     This class runs a command in a subprocess and logs its output to a file
     in real-time. It's particularly useful for logging SmartThings CLI commands.
+    
+    Output is written through a buffered file that a background thread
+    flushes every LOG_FLUSH_INTERVAL seconds, instead of flushing per line.
     """
     
     def __init__(self, command: List[str], log_file_name: str):
@@ -35,11 +42,14 @@ class CommandLogger:
         self.process: Optional[subprocess.Popen] = None
         self.log_file = None
         self.stop_logging = False
+        self._flush_stop = threading.Event()
+        # Serializes writes and periodic flushes; the file object is not thread-safe
+        self._log_lock = threading.Lock()
 
     def start(self) -> None:
         """Start the subprocess and begin logging its output."""
         os.makedirs(os.path.dirname(self.log_file_name), exist_ok=True)
-        self.log_file = open(self.log_file_name, 'w')
+        self.log_file = open(self.log_file_name, 'w', buffering=LOG_BUFFER_SIZE)
 
         self.process = subprocess.Popen(
             self.command,
@@ -53,6 +63,10 @@ class CommandLogger:
         self.logging_thread = threading.Thread(target=self._log_output)
         self.logging_thread.start()
 
+        # Flush buffered output periodically so the log file stays current
+        self.flush_thread = threading.Thread(target=self._flush_periodically, daemon=True)
+        self.flush_thread.start()
+
         print(f'Logging to {self.log_file_name}... Press "Enter" to stop.')
 
     def send_input(self, user_input: str) -> None:
@@ -72,8 +86,14 @@ class CommandLogger:
             if self.stop_logging:
                 break
             print(line, end='')
-            self.log_file.write(line)
-            self.log_file.flush()
+            with self._log_lock:
+                self.log_file.write(line)
+
+    def _flush_periodically(self) -> None:
+        """Flush the log file every LOG_FLUSH_INTERVAL seconds until stopped."""
+        while not self._flush_stop.wait(LOG_FLUSH_INTERVAL):
+            with self._log_lock:
+                self.log_file.flush()
 
     def stop(self) -> None:
         """Stop logging and terminate the subprocess."""
@@ -82,6 +102,9 @@ class CommandLogger:
             self.process.terminate()
         if hasattr(self, 'logging_thread'):
             self.logging_thread.join()
+        self._flush_stop.set()
+        if hasattr(self, 'flush_thread'):
+            self.flush_thread.join()
         if self.log_file:
             self.log_file.close()
         print("\nLogging stopped.")
@@ -91,7 +114,9 @@ class Logger:
     """
     General-purpose logger for application output.
     
-    This class redirects stdout to both console and log file.
+    This class redirects stdout to both console and log file. Log records
+    are handed to a background QueueListener, so printing threads never
+    wait on the file write.
     """
     
     def __init__(self, log_file_name: str):
@@ -102,34 +127,46 @@ class Logger:
             log_file_name: Name of the file to log output
         """
         self.log_file_name = log_file_name
-        self.log_file = None
         self.stop_logging = False
+        self.listener: Optional[QueueListener] = None
+        self.queue_handler: Optional[QueueHandler] = None
 
         os.makedirs(os.path.dirname(log_file_name), exist_ok=True)
         
-        # Set up logging configuration
-        logging.basicConfig(
-            filename=log_file_name,
-            level=logging.DEBUG,
-            encoding='utf-8',
-            format='%(asctime)s - %(levelname)s - %(message)s'
-        )
+        # Set up logging configuration; like logging.basicConfig, this is
+        # skipped if the root logger already has handlers
         self.logger = logging.getLogger()
+        if not self.logger.handlers:
+            # The file is opened on the first record, not at construction
+            file_handler = logging.FileHandler(log_file_name, encoding='utf-8', delay=True)
+            file_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+            
+            log_queue: queue.Queue = queue.Queue(-1)
+            self.listener = QueueListener(log_queue, file_handler)
+            self.listener.start()
+            
+            self.queue_handler = QueueHandler(log_queue)
+            self.logger.addHandler(self.queue_handler)
+            self.logger.setLevel(logging.DEBUG)
 
         # Redirect stdout to the logger
         sys.stdout = self._LogWriter(self.logger.info)
 
     def start(self) -> None:
         """Start logging."""
-        os.makedirs(os.path.dirname(self.log_file_name), exist_ok=True)
-        self.log_file = open(self.log_file_name, 'w')
         print(f"Started logging to {self.log_file_name}...")
 
     def stop(self) -> None:
-        """Stop logging."""
+        """Stop logging, writing out any queued records and closing the file."""
         self.stop_logging = True
-        if self.log_file:
-            self.log_file.close()
+        if self.queue_handler:
+            self.logger.removeHandler(self.queue_handler)
+            self.queue_handler = None
+        if self.listener:
+            self.listener.stop()
+            for handler in self.listener.handlers:
+                handler.close()
+            self.listener = None
 
     class _LogWriter:
         """Internal class to write to both log file and console."""
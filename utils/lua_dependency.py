@@ -8,23 +8,81 @@ dependencies.
 
 import os
 import re
-import json
-import queue
-from typing import Dict, List, Tuple, Optional
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Dict, Iterator, List, Set, Tuple, Optional, Pattern
+
+from utils.json_processor import loads_json, dumps_json
+
+# local <name> = require "<module.path>"
+_LOCAL_REQUIRE_RE = re.compile(r'local\s+(\w+)\s*=\s*require\s*["\']([\w\.]+)["\']')
+
+
+@lru_cache(maxsize=4096)
+def _reference_pattern(module_name: str) -> Pattern:
+    """
+    Get the compiled pattern matching references to a module's members.
+    
+    Args:
+        module_name: Module name to search for
+        
+    Returns:
+        Compiled pattern
+    """
+    return re.compile(rf'{re.escape(module_name)}\.[\w_]+')
+
+
+@lru_cache(maxsize=4096)
+def _function_block_pattern(function_name: str) -> Pattern:
+    """
+    Get the compiled pattern matching a function's definition block.
+    
+    Args:
+        function_name: Function name to extract
+        
+    Returns:
+        Pattern matching both "name = function(...)" and "function name(...)"
+    """
+    escaped = re.escape(function_name)
+    return re.compile(
+        rf"(?:{escaped}\s*=\s*function|function\s+{escaped})\s*\(.*?\)\s*\n(.*?)^end\s*$",
+        re.MULTILINE | re.DOTALL
+    )
+
+
+@lru_cache(maxsize=1024)
+def _read_lua_file_cached(abs_path: str, mtime_ns: int) -> str:
+    """
+    Read a file, cached by absolute path and modification time.
+    
+    Args:
+        abs_path: Absolute file path
+        mtime_ns: File modification time, part of the cache key only
+        
+    Returns:
+        File content as string
+    """
+    with open(abs_path, 'r', encoding='utf-8') as file:
+        return file.read()
 
 
 def read_lua_file(file_path: str) -> str:
     """
     Read a Lua file and return its content.
     
+    Contents are cached and re-read only when the file's modification
+    time changes, so files shared across a dependency walk are read once.
+    Call _read_lua_file_cached.cache_clear() to release the cache.
+    
     Args:
         file_path: Path to Lua file
         
     Returns:
         File content as string
     """
-    with open(file_path, 'r', encoding='utf-8') as file:
-        return file.read()
+    abs_path = os.path.abspath(file_path)
+    return _read_lua_file_cached(abs_path, os.stat(abs_path).st_mtime_ns)
 
 
 def write_files(file_path: str, content: str) -> None:
@@ -36,7 +94,7 @@ def write_files(file_path: str, content: str) -> None:
         content: Content to append
     """
     with open(file_path, "a", encoding="utf-8") as file:
-        file.write(f"{content}")
+        file.write(content)
 
 
 def find_references(lua_code: str, module_name: str) -> List[str]:
@@ -50,9 +108,61 @@ def find_references(lua_code: str, module_name: str) -> List[str]:
     Returns:
         List of matching references
     """
-    pattern = rf'{re.escape(module_name)}\.[\w_]+'
-    matches = re.findall(pattern, lua_code)
-    return matches
+    # Most files never mention the module; skip the regex scan for them
+    if module_name not in lua_code:
+        return []
+    return _reference_pattern(module_name).findall(lua_code)
+
+
+@lru_cache(maxsize=1024)
+def _all_references_pattern(module_names: Tuple[str, ...]) -> Pattern:
+    """
+    Get the compiled pattern matching references to any of several modules.
+    
+    The lookahead makes finditer report a match at every position, so
+    overlapping references to different modules are all found.
+    
+    Args:
+        module_names: Module names to search for
+        
+    Returns:
+        Compiled pattern; group 1 is the reference, group 2 the module name
+    """
+    alternation = '|'.join(re.escape(name) for name in module_names)
+    return re.compile(rf'(?=(({alternation})\.[\w_]+))')
+
+
+def find_all_references(lua_code: str, module_names: List[str]) -> Dict[str, Set[str]]:
+    """
+    Find references to each of several modules in one scan of Lua code.
+    
+    Gives the same references per module as calling find_references once
+    per module. Two module names never match at the same position (each
+    must be followed by "."), and matches overlapping an earlier match of
+    the same module are skipped, as findall would.
+    
+    Args:
+        lua_code: Lua source code
+        module_names: Module names to search for
+        
+    Returns:
+        Dictionary mapping each module name to its set of references
+    """
+    references: Dict[str, Set[str]] = {name: set() for name in module_names}
+    present = tuple(sorted(name for name in references if name in lua_code))
+    if not present:
+        return references
+    
+    last_end: Dict[str, int] = {}
+    pattern = _all_references_pattern(present)
+    for match in pattern.finditer(lua_code):
+        reference, module_name = match.group(1), match.group(2)
+        start = match.start()
+        if start < last_end.get(module_name, 0):
+            continue
+        references[module_name].add(reference)
+        last_end[module_name] = start + len(reference)
+    return references
 
 
 def extract_local_requirements(lua_code: str) -> List[Tuple[str, str]]:
@@ -65,9 +175,7 @@ def extract_local_requirements(lua_code: str) -> List[Tuple[str, str]]:
     Returns:
         List of tuples (variable_name, module_path)
     """
-    pattern = r'local\s+(\w+)\s*=\s*require\s*["\']([\w\.]+)["\']'
-    matches = re.findall(pattern, lua_code)
-    return matches
+    return _LOCAL_REQUIRE_RE.findall(lua_code)
 
 
 def extract_function_block(lua_code: str, function_name: str) -> Optional[str]:
@@ -81,25 +189,20 @@ def extract_function_block(lua_code: str, function_name: str) -> Optional[str]:
     Returns:
         Function block as string, or None if not found
     """
-    # Try different function definition patterns
-    pattern = rf"{re.escape(function_name)}\s*=\s*function\s*\(.*?\)\s*\n(.*?)^end\s*$"
-    pattern_1 = rf"function\s+{re.escape(function_name)}\s*\(.*?\)\s*\n(.*?)^end\s*$"
-    
-    match = re.search(pattern, lua_code, re.MULTILINE | re.DOTALL)
-    if match:
-        return match.group(0)
-    
-    match_1 = re.search(pattern_1, lua_code, re.MULTILINE | re.DOTALL)
-    if match_1:
-        return match_1.group(0)
+    if function_name not in lua_code:
+        return None
     
-    return None
+    # One scan matches either function definition form
+    match = _function_block_pattern(function_name).search(lua_code)
+    return match.group(0) if match else None
 
 
 def extract_dependencies(unique: str, dependencies_obj: Dict) -> List[str]:
     """
     Extract all dependencies for a given module recursively.
     
+    Modules are returned once each, in breadth-first order.
+    
     Args:
         unique: Module name
         dependencies_obj: Dictionary mapping files to their dependencies
@@ -108,27 +211,47 @@ def extract_dependencies(unique: str, dependencies_obj: Dict) -> List[str]:
         List of dependency module names
     """
     dependencies = []
-    q = queue.Queue()
 
     unique = unique.split('.')[1] if '.' in unique else unique
-    q.put(unique)
+    q = deque([unique])
+    # Enqueue each module once, so shared and cyclic dependencies are not
+    # re-expanded
+    visited = {unique}
     
-    while not q.empty():
-        temp = q.get()
-        if f'{temp}.lua' in dependencies_obj.keys():
+    while q:
+        temp = q.popleft()
+        value_array = dependencies_obj.get(f'{temp}.lua')
+        if value_array is not None:
             dependencies.append(temp)
-            value_array = dependencies_obj[f'{temp}.lua']
             for value in value_array:
-                q.put(value[0])
+                child = value[0]
+                if child not in visited:
+                    visited.add(child)
+                    q.append(child)
 
     return dependencies
 
 
+@lru_cache(maxsize=8192)
+def _module_path(parent_folder: str, dotted_path: str) -> str:
+    """
+    Convert a dotted module path to a file system path under a folder.
+    
+    Args:
+        parent_folder: Base folder path
+        dotted_path: Module path such as "st.zigbee.zdo"
+        
+    Returns:
+        Path without extension, e.g. "<parent_folder>/st/zigbee/zdo"
+    """
+    return os.path.join(parent_folder, *dotted_path.split('.'))
+
+
 def parse_transmitting_dependency(
     parent_folder: str,
     depen_dic: List[str],
     dependencies_obj: Dict
-) -> Dict[str, List[str]]:
+) -> Dict[str, Set[str]]:
     """
     Parse and extract dependencies for a list of modules.
     
@@ -150,21 +273,16 @@ def parse_transmitting_dependency(
             unique = value[0]
             folder = value[1]
 
-            sub_key = f'{unique}.lua'
-            if sub_key in dependencies_obj.keys():
-                target_lua_file = f'{parent_folder}/{folder.replace(".", "/")}.lua'
+            target_lua_file = f'{_module_path(parent_folder, folder)}.lua'
+            if f'{unique}.lua' in dependencies_obj:
                 code_content = read_lua_file(target_lua_file)
-
-                reference_functions = find_references(code_content, unique)
-                unique_functions = list(set(reference_functions))
-                return_obj[target_lua_file] = unique_functions
             else:
-                target_lua_file = f'{parent_folder}/{folder.replace(".", "/")}.lua'
-                if os.path.exists(target_lua_file):
+                # Modules outside the scanned tree may not exist on disk
+                try:
                     code_content = read_lua_file(target_lua_file)
-                    reference_functions = find_references(code_content, unique)
-                    unique_functions = list(set(reference_functions))
-                    return_obj[target_lua_file] = unique_functions
+                except FileNotFoundError:
+                    continue
+            return_obj[target_lua_file] = set(find_references(code_content, unique))
 
     return return_obj
 
@@ -184,10 +302,11 @@ def generate_new_combine_lua(
         filename: Lua filename
         extract_depen_obj: Dictionary mapping file paths to function lists
     """
-    destination = f'{parent_folder}/{sub_folder}/{filename}'
+    destination = os.path.join(parent_folder, sub_folder, filename)
     original_code = read_lua_file(destination)
 
-    combine_code = ''
+    # Collect the extracted functions and join them once
+    combine_parts = []
 
     for key in extract_depen_obj.keys():
         if not os.path.exists(key):
@@ -204,7 +323,9 @@ def generate_new_combine_lua(
             extract_function = extract_function_block(code_content, temp_func)
             if extract_function:
                 extract_function = extract_function.replace(temp_func, func)
-                combine_code += f"\n{extract_function}"
+                combine_parts.append(f"\n{extract_function}")
+    
+    combine_code = ''.join(combine_parts)
     
     write_code = f'''
     ------------------import functions begin------------------\n
@@ -213,7 +334,7 @@ def generate_new_combine_lua(
 
     {original_code}
     '''
-    write_path = f'{parent_folder}/{sub_folder}/{filename.split(".")[0]}_new.lua'
+    write_path = os.path.join(parent_folder, sub_folder, f'{filename.split(".")[0]}_new.lua')
     write_files(write_path, write_code)
 
 
@@ -232,27 +353,29 @@ def get_target_code(
         filename: Target Lua filename
         dependencies_file: Path to JSON file containing dependency mappings
     """
-    destination = f'{parent_folder}/{sub_folder}/{filename}'
+    destination = os.path.join(parent_folder, sub_folder, filename)
 
     # Load dependencies
-    dependencies_content = read_lua_file(dependencies_file)
-    dependencies_obj = json.loads(dependencies_content.rstrip())
+    dependencies_obj = loads_json(read_lua_file(dependencies_file))
 
-    if filename not in dependencies_obj.keys():
+    if filename not in dependencies_obj:
         print('There are no dependencies, no need to extend...')
         return
 
     dependencies_array = dependencies_obj[filename]
 
     code_content = read_lua_file(destination)
-    extract_depen_obj = {}
+    # Referenced functions per dependency file, as sets for O(1) merging
+    extract_depen_obj: Dict[str, Set[str]] = {}
+    
+    # Scan the target code once for references to every required module
+    module_references = find_all_references(code_content, [module for module, _ in dependencies_array])
     
     for module, reference in dependencies_array:
-        reference_functions = find_references(code_content, module)
-        unique_functions = list(set(reference_functions))
+        unique_functions = module_references[module]
 
         folder_flag = False
-        sub_destination = f'{parent_folder}/{reference.replace(".", "/")}'
+        sub_destination = _module_path(parent_folder, reference)
         if os.path.isdir(sub_destination):
             folder_flag = True
 
@@ -261,52 +384,92 @@ def get_target_code(
             
             if len(depen_dic) <= 0:
                 if folder_flag:
-                    target_lua_file = f'{sub_destination}/init.lua'
+                    target_lua_file = os.path.join(sub_destination, 'init.lua')
                 else:
                     target_lua_file = f'{sub_destination}.lua'
                 
-                if target_lua_file not in extract_depen_obj.keys():
-                    extract_depen_obj[target_lua_file] = [unique]
-                else:
-                    extract_depen_obj[target_lua_file].append(unique)
+                extract_depen_obj.setdefault(target_lua_file, set()).add(unique)
             else:
-                combo = f'{reference.replace(".", "/")}/{unique.split(".")[1]}.lua'
-                target_lua_file = f'{parent_folder}/{combo}'
-                extract_depen_obj[target_lua_file] = []
+                target_lua_file = os.path.join(sub_destination, f'{unique.split(".")[1]}.lua')
+                # Keep functions already collected for this file
+                extract_depen_obj.setdefault(target_lua_file, set())
                 return_obj = parse_transmitting_dependency(parent_folder, depen_dic, dependencies_obj)
                 
-                for key in return_obj:
-                    if key not in extract_depen_obj.keys():
-                        extract_depen_obj[key] = return_obj[key]
-                    else:
-                        values = return_obj[key]
-                        for val in values:
-                            if val not in extract_depen_obj[key]:
-                                extract_depen_obj[key].append(val)
+                for key, values in return_obj.items():
+                    extract_depen_obj.setdefault(key, set()).update(values)
     
-    generate_new_combine_lua(parent_folder, sub_folder, filename, extract_depen_obj)
+    generate_new_combine_lua(
+        parent_folder,
+        sub_folder,
+        filename,
+        {key: sorted(functions) for key, functions in extract_depen_obj.items()}
+    )
+
+
+def _iter_lua_files(folder: str) -> Iterator[str]:
+    """
+    Recursively yield .lua file paths, in the same order as os.walk.
+    
+    Uses os.scandir directly, so directory entries are classified from
+    the readdir results and names are filtered before anything else.
+    
+    Args:
+        folder: Folder to scan
+        
+    Yields:
+        Paths of .lua files
+    """
+    subdirs = []
+    try:
+        entries = os.scandir(folder)
+    except OSError:
+        # os.walk skips unreadable or missing directories silently
+        return
+    with entries:
+        for entry in entries:
+            if entry.is_dir():
+                # Like os.walk, list directory symlinks but don't follow them
+                if not entry.is_symlink():
+                    subdirs.append(entry.path)
+            elif entry.name.endswith('.lua'):
+                yield entry.path
+    for subdir in subdirs:
+        yield from _iter_lua_files(subdir)
+
+
+def _scan_lua_requirements(file_path: str) -> Tuple[str, List[Tuple[str, str]]]:
+    """
+    Read a Lua file and extract its local require statements.
+    
+    Top-level so it can be pickled for process pool workers.
+    
+    Args:
+        file_path: Path to Lua file
+        
+    Returns:
+        Tuple of (file name, list of (variable_name, module_path))
+    """
+    return os.path.basename(file_path), extract_local_requirements(read_lua_file(file_path))
 
 
 def generate_dependency_json(folder: str, output_file: str) -> None:
     """
     Generate a JSON file mapping Lua files to their dependencies.
     
+    Files are read and scanned in a process pool, since the regex scan is
+    CPU-bound.
+    
     Args:
         folder: Folder to scan for Lua files
         output_file: Path to output JSON file
     """
-    requirement_local = {}
-
-    for root, dirs, files in os.walk(folder):
-        for file in files:
-            if file.endswith('.lua'):
-                file_path = os.path.join(root, file)
-                lua_code = read_lua_file(file_path)
-                local_requires = extract_local_requirements(lua_code)
+    lua_files = list(_iter_lua_files(folder))
 
-                if len(local_requires) > 0:
-                    requirement_local[file] = local_requires
+    requirement_local = {}
+    with ProcessPoolExecutor() as executor:
+        for file, local_requires in executor.map(_scan_lua_requirements, lua_files, chunksize=32):
+            if len(local_requires) > 0:
+                requirement_local[file] = local_requires
     
-    write_files(output_file, json.dumps(requirement_local))
+    write_files(output_file, dumps_json(requirement_local))
     print(f"Generated dependency JSON with {len(requirement_local.keys())} files")
-